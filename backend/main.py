@@ -8,8 +8,9 @@ and integration with the database and AI chatbot services.
 from fastapi import FastAPI, HTTPException, Depends, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -29,7 +30,7 @@ from backend.models import ChatMessage, ChatResponse, BaseResponse
 
 # Import LangChain chatbot from req_agents
 try:
-    from req_agents.simple_chatbot import LangChainChatbot
+    from req_agents.simple_chatbot import LangChainChatbot, IntelligentRouter, shared_sessions_enabled
     CHATBOT_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Chatbot not available: {e}")
@@ -81,6 +82,9 @@ database_manager = None
 # Global chatbot sessions (in production, use proper session management)
 chatbot_sessions = {}
 
+# Router shared by all chatbot sessions, so tools and their clients are created once
+chatbot_router = None
+
 # Document processing service instance
 document_processing_service = None
 
@@ -92,8 +96,13 @@ def get_or_create_chatbot(conversation_id: str) -> 'LangChainChatbot':
             detail="Chatbot service is not available"
         )
     
+    global chatbot_router
+    if chatbot_router is None:
+        chatbot_router = IntelligentRouter()
+    
     if conversation_id not in chatbot_sessions:
-        chatbot_sessions[conversation_id] = LangChainChatbot()
+        # Keyed by conversation ID so the conversation is shared across workers when REDIS_URL is set
+        chatbot_sessions[conversation_id] = LangChainChatbot(chatbot_router, session_id=conversation_id)
     
     return chatbot_sessions[conversation_id]
 
@@ -191,7 +200,7 @@ async def chat_with_bot(message: ChatMessage, request: Request):
         chatbot = get_or_create_chatbot(conversation_id)
         
         # Process the message using LangChain
-        response_text = chatbot.chat(message.message)
+        response_text = await chatbot.achat(message.message)
         
         # Determine which tool was used based on response content
         tool_used = None
@@ -204,12 +213,11 @@ async def chat_with_bot(message: ChatMessage, request: Request):
         elif "CAREER COUNSELING SESSION" in response_text:
             tool_used = "Career_Counseling"
         
-        # Get conversation history for context
-        history = chatbot.get_conversation_history()
+        # The local session is in sync after the turn, so no store round-trip is needed
         context_data = {
-            "conversation_length": len(history),
+            "conversation_length": len(chatbot.conversation_history),
             "application_id": message.application_id,
-            "has_applicant_context": bool(chatbot.router.current_applicant_data)
+            "has_applicant_context": bool(chatbot.session.applicant_data)
         }
         
         return ChatResponse(
@@ -227,20 +235,42 @@ async def chat_with_bot(message: ChatMessage, request: Request):
             detail=f"Chat processing failed: {str(e)}"
         )
 
+@app.post("/api/v1/chatbot/chat/stream")
+async def chat_with_bot_stream(message: ChatMessage):
+    """Chat with the AI assistant, streaming the response text as it is generated."""
+    # Generate conversation ID if not provided
+    conversation_id = message.conversation_id or str(uuid.uuid4())
+    
+    # Get or create chatbot session
+    chatbot = get_or_create_chatbot(conversation_id)
+    
+    # Chunks are awaited from the LLM's async stream, so no threadpool worker is held per response
+    return StreamingResponse(
+        chatbot.achat_stream(message.message),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Conversation-ID": conversation_id}
+    )
+
 @app.get("/api/v1/chatbot/conversation/{conversation_id}/history")
 async def get_conversation_history(conversation_id: str):
     """Get conversation history for a specific conversation."""
     try:
-        if conversation_id not in chatbot_sessions:
+        # With a shared session store, another worker may have served the conversation
+        known_locally = conversation_id in chatbot_sessions
+        if known_locally or (CHATBOT_AVAILABLE and shared_sessions_enabled()):
+            chatbot = get_or_create_chatbot(conversation_id)
+            history = await asyncio.to_thread(chatbot.get_conversation_history)
+        else:
+            history = []
+        
+        if not history and not known_locally:
+            chatbot_sessions.pop(conversation_id, None)
             return {
                 "conversation_id": conversation_id,
                 "history": [],
                 "message": "No conversation found"
             }
         
-        chatbot = chatbot_sessions[conversation_id]
-        history = chatbot.get_conversation_history()
-        
         return {
             "conversation_id": conversation_id,
             "history": history,
@@ -257,8 +287,9 @@ async def get_conversation_history(conversation_id: str):
 async def clear_conversation(conversation_id: str):
     """Clear conversation history for a specific conversation."""
     try:
-        if conversation_id in chatbot_sessions:
-            chatbot_sessions[conversation_id].reset_conversation()
+        if CHATBOT_AVAILABLE:
+            # Reset even when another worker served the conversation, clearing any shared state
+            await asyncio.to_thread(get_or_create_chatbot(conversation_id).reset_conversation)
             del chatbot_sessions[conversation_id]
         
         return BaseResponse(
@@ -331,7 +362,7 @@ async def quick_query(request: QuickQueryRequest):
         chatbot = LangChainChatbot()
         
         # Process the query using LangChain
-        response = chatbot.chat(request.query)
+        response = await chatbot.achat(request.query)
         
         return {
             "success": True,
@@ -0,0 +1,56 @@
+"""
+Cache helpers shared by the chatbot and its tools.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class LRUCache:
+    """Small bounded mapping that evicts the least recently used entry.
+    
+    With a ttl (seconds), entries also expire that long after they were stored;
+    put() can give a single entry its own ttl.
+    """
+    
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expiry or None, value), least recently used first
+        self._data = OrderedDict()
+        # Routers and lookup tools are used from worker threads
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        """Return the cached value for key (marking it recently used), or default."""
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+            if expires is not None and time.monotonic() >= expires:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def put(self, key, value, ttl: Optional[float] = None):
+        """Store a value, evicting the oldest entry when full."""
+        if ttl is None:
+            ttl = self.ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
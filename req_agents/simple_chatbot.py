@@ -4,76 +4,616 @@ LangChain-Enhanced Social Security Chatbot
 An intelligent chatbot using LangChain framework for tool routing and conversation management.
 """
 
+import asyncio
+import atexit
+import hashlib
 import re
-from typing import Dict, Any, Optional, List
+import string
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, AsyncIterator, Iterator, Optional, List, Tuple
 import sys
 import os
 import json
+from collections import deque
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from itertools import islice
 from pathlib import Path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
+from types import SimpleNamespace
+# Sibling modules are imported by name so the file also runs as a script; the directory
+# is added once even when the module is imported under both names
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+if _MODULE_DIR not in sys.path:
+    sys.path.append(_MODULE_DIR)
+
+from cache_utils import LRUCache
 from simple_database_tools import SimpleApplicationQuery
 from search_tools import JobSearchTool, CourseRecommendationTool
 
-# Load environment variables (with fallback)
+# Environment variables are loaded from .env on first use (see _ensure_env)
+_ENV_LOADED = False
+
+
+def _ensure_env():
+    """Load .env into the environment once, if python-dotenv is installed."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        _ENV_LOADED = True
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+
+
+# LangChain is heavy to import, so it is only loaded when the counseling tool
+# is first created (see _load_langchain). None means not probed yet, False
+# means unavailable.
+_LANGCHAIN = None
+
+
+def _load_langchain():
+    """Import LangChain on first call and return its components, or False if missing."""
+    global _LANGCHAIN
+    if _LANGCHAIN is None:
+        try:
+            from langchain.tools import Tool as LangChainTool
+            from langchain.prompts import ChatPromptTemplate
+            
+            # Try newer imports first, fallback to older ones
+            try:
+                from langchain_openai import ChatOpenAI
+                openai_available = True
+            except ImportError:
+                from langchain.chat_models import ChatOpenAI
+                openai_available = False
+            
+            from langchain.chains import LLMChain
+            
+            _LANGCHAIN = SimpleNamespace(
+                Tool=LangChainTool,
+                ChatPromptTemplate=ChatPromptTemplate,
+                ChatOpenAI=ChatOpenAI,
+                LLMChain=LLMChain,
+                openai_available=openai_available
+            )
+        except ImportError:
+            _LANGCHAIN = False
+    return _LANGCHAIN
+
+
+# Fallback classes for when LangChain is not available
+class Tool:
+    __slots__ = ('name', 'description', 'func')
+    
+    def __init__(self, name, description, func):
+        self.name = name
+        self.description = description
+        self.func = func
+
+
+class BaseMessage:
+    __slots__ = ()
+
+
+class HumanMessage(BaseMessage):
+    __slots__ = ('content',)
+    
+    def __init__(self, content):
+        self.content = content
+
+
+class AIMessage(BaseMessage):
+    __slots__ = ('content',)
+    
+    def __init__(self, content):
+        self.content = content
+
+# Multi-pattern keyword matching (Hyperscan, then Aho-Corasick, then plain substring scans)
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    DOTENV_AVAILABLE = True
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
 except ImportError:
-    DOTENV_AVAILABLE = False
+    HYPERSCAN_AVAILABLE = False
 
-# LangChain imports (with fallback for missing dependencies)
 try:
-    from langchain.tools import Tool
-    from langchain.schema import BaseMessage, HumanMessage, AIMessage
-    from langchain.prompts import PromptTemplate
-    
-    # Try newer imports first, fallback to older ones
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Fast JSON decoding (with fallback to the standard library)
+try:
+    import orjson
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
+
+@lru_cache(maxsize=256)
+def _load_json_cached(path_str: str, mtime_ns: int) -> dict:
+    """Parse a JSON file. The mtime is part of the cache key so rewritten files are re-read."""
+    with open(path_str, 'rb') as f:
+        return _json_loads(f.read())
+
+
+def _load_json(path) -> dict:
+    """Load a workflow JSON file through the mtime-keyed cache (callers must not mutate it)."""
+    return _load_json_cached(str(path), os.stat(path).st_mtime_ns)
+
+
+def _load_json_if_exists(path) -> Optional[dict]:
+    """Like _load_json, but return None when the file (or its directory) does not exist."""
     try:
-        from langchain_openai import ChatOpenAI
-        from langchain_community.llms import OpenAI
-    except ImportError:
-        from langchain.chat_models import ChatOpenAI
-        from langchain.llms import OpenAI
+        return _load_json(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+# Incremental JSON parsing for large workflow state files (optional)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+_STREAM_BUF_SIZE = 1 << 20  # 1 MiB reads keep syscalls low on multi-MB workflow files
+_STREAM_MIN_BYTES = 1 << 20  # smaller files parse faster in one go
+
+
+def _read_workflow_state(path) -> Tuple[Optional[dict], dict]:
+    """Return (first resume document or None, applicant_info) from a workflow_state.json.
     
-    # Try newer chain approach, fallback to LLMChain
+    Large files are streamed with ijson so the documents after the resume are never
+    decoded; small ones are parsed in one go with orjson/json. The parsed file is not
+    kept: callers cache the context they build from it. A missing file yields (None, {}).
+    """
     try:
-        from langchain.chains import LLMChain
-    except ImportError:
-        pass
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None, {}
+    if not IJSON_AVAILABLE or st.st_size < _STREAM_MIN_BYTES:
+        with open(path, 'rb') as f:
+            workflow_data = _json_loads(f.read())
+        resume_doc = next(
+            (doc for doc in workflow_data.get('processed_documents', []) if doc.get('document_type') == 'resume'),
+            None
+        )
+        return resume_doc, workflow_data.get('applicant_info', {})
     
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    # Fallback classes for when LangChain is not available
-    class Tool:
-        def __init__(self, name, description, func):
-            self.name = name
-            self.description = description
-            self.func = func
-    
-    class BaseMessage:
+    with open(path, 'rb') as f:
+        resume_doc = None
+        for doc in ijson.items(f, 'processed_documents.item', use_float=True, buf_size=_STREAM_BUF_SIZE):
+            if doc.get('document_type') == 'resume':
+                resume_doc = doc
+                break
+        
+        f.seek(0)
+        applicant_info = next(ijson.items(f, 'applicant_info', use_float=True, buf_size=_STREAM_BUF_SIZE), {})
+    
+    return resume_doc, applicant_info
+
+
+_MISSING = object()  # cache sentinel for lookups whose cached value may be None
+
+
+# sentence-transformers (and torch behind it) is heavy, so the encoder for the
+# semantic reply cache is only loaded when that cache is enabled
+_SEMANTIC = None
+
+
+def _load_semantic_encoder():
+    """Import numpy/sentence-transformers on first call and return (np, encoder), or False if missing."""
+    global _SEMANTIC
+    if _SEMANTIC is None:
+        try:
+            import numpy as np
+            from sentence_transformers import SentenceTransformer
+            
+            _SEMANTIC = (np, SentenceTransformer(os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")))
+        except ImportError:
+            _SEMANTIC = False
+        except Exception as e:
+            print(f"⚠️ Semantic cache disabled, could not load the embedding model: {e}")
+            _SEMANTIC = False
+    return _SEMANTIC
+
+
+class SemanticCache:
+    """Ring buffer of reply embeddings answering near-duplicate questions by cosine similarity.
+    
+    Each entry is tagged with the keyword labels (intents and job titles) detected in its
+    question, and only entries with the same labels can match, so paraphrases hit while
+    "jobs for manager" never answers "jobs for engineer".
+    """
+    
+    __slots__ = ('np', 'encoder', 'threshold', '_batcher', '_embeddings', '_label_ids', '_responses', '_labels', '_size', '_next')
+    
+    def __init__(self, np, encoder, maxsize: int = 1024, threshold: float = 0.92):
+        self.np = np
+        self.encoder = encoder
+        self.threshold = threshold
+        self._batcher = EmbeddingBatcher(encoder)
+        self._embeddings = np.zeros((maxsize, encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+        self._label_ids = np.full(maxsize, -1, dtype=np.int64)
+        self._responses = [None] * maxsize
+        self._labels = {}
+        self._size = 0
+        self._next = 0
+    
+    def encode(self, text: str):
+        """Embed a question."""
+        return self.encoder.encode(text, normalize_embeddings=True)
+    
+    async def aencode(self, text: str):
+        """Embed a question in one encoder call with any concurrently submitted ones."""
+        return await self._batcher.submit(text)
+    
+    def match(self, query, labels) -> Optional[str]:
+        """Return the cached reply for the nearest same-labelled question embedding, if close enough."""
+        label_id = self._labels.get(frozenset(labels))
+        if label_id is None or not self._size:
+            return None
+        
+        sims = self._embeddings[:self._size] @ query.astype(self.np.float32)
+        sims[self._label_ids[:self._size] != label_id] = -1.0
+        best = int(sims.argmax())
+        if sims[best] > self.threshold:
+            return self._responses[best]
+        return None
+    
+    def add(self, query, labels, response: str):
+        """Store a reply under its query embedding, overwriting the oldest entry when full."""
+        label_id = self._labels.setdefault(frozenset(labels), len(self._labels))
+        slot = self._next
+        self._embeddings[slot] = query
+        self._label_ids[slot] = label_id
+        self._responses[slot] = response
+        self._next = (slot + 1) % len(self._responses)
+        self._size = min(self._size + 1, len(self._responses))
+    
+    def clear(self):
+        """Drop every cached reply."""
+        self._label_ids.fill(-1)
+        self._responses = [None] * len(self._responses)
+        self._labels.clear()
+        self._size = 0
+        self._next = 0
+
+
+# Application ID formats: APP-YYYY-XXXXXX and UUID
+_APP_ID_RE = re.compile(r'APP-\d{4}-\d{6}', re.IGNORECASE)
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+
+
+# Workflow processing status / final decision display values
+_STATUS_EMOJI = {
+    'completed': '✅',
+    'processing': '🔄',
+    'failed': '❌',
+    'pending': '⏳'
+}
+_DECISION_EMOJI = {
+    'approved': '✅',
+    'conditionally_approved': '⚠️',
+    'pending_review': '🔍',
+    'rejected': '❌'
+}
+_DECISION_LABELS = {
+    'approved': 'Approved',
+    'conditionally_approved': 'Conditionally Approved',
+    'pending_review': 'Pending Review',
+    'pending': 'Pending',
+    'rejected': 'Rejected'
+}
+
+
+class KeywordMatcher:
+    """Match many labelled keywords against a text in a single pass.
+    
+    Uses a SIMD Hyperscan database or an Aho-Corasick automaton when one of those
+    libraries is installed, otherwise falls back to substring scans with the same semantics.
+    """
+    
+    def __init__(self, labelled_keywords):
+        """Build the matcher from (label, keywords) pairs."""
+        self.keywords = {}
+        for label, keywords in labelled_keywords:
+            for keyword in keywords:
+                self.keywords.setdefault(keyword, set()).add(label)
+        
+        self.database = None
+        self.automaton = None
+        if HYPERSCAN_AVAILABLE:
+            self._pattern_labels = [frozenset(labels) for labels in self.keywords.values()]
+            self.database = hyperscan.Database()
+            self.database.compile(
+                expressions=[re.escape(keyword).encode() for keyword in self.keywords],
+                ids=list(range(len(self.keywords))),
+                elements=len(self.keywords),
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(self.keywords)
+            )
+        elif AHOCORASICK_AVAILABLE:
+            self.automaton = ahocorasick.Automaton()
+            for keyword, labels in self.keywords.items():
+                self.automaton.add_word(keyword, frozenset(labels))
+            self.automaton.make_automaton()
+    
+    def match(self, text: str) -> set:
+        """Return the labels of every keyword occurring in the text."""
+        matched = set()
+        
+        if self.database is not None:
+            def on_match(pattern_id, start, end, flags, context):
+                matched.update(self._pattern_labels[pattern_id])
+            
+            self.database.scan(text.encode(), match_event_handler=on_match)
+            return matched
+        
+        if self.automaton is not None:
+            for _, labels in self.automaton.iter(text):
+                matched |= labels
+            return matched
+        
+        return {label for keyword, labels in self.keywords.items() if keyword in text for label in labels}
+
+
+class MicroBatcher(ABC):
+    """Coalesce concurrent requests into micro-batches handled by a single _run_batch call."""
+    
+    def __init__(self, window: float = 0.05, max_batch_size: int = 16):
+        """Initialize the batcher with a collection window in seconds."""
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._loop = None
+        self._queue = None
+        self._worker = None
+    
+    async def submit(self, item):
+        """Queue a request and wait for its result."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The queue and worker task are bound to the event loop they were created on
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+        
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._drain())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+    
+    @abstractmethod
+    async def _run_batch(self, items: list) -> list:
+        """Handle a batch of requests, returning one result per request."""
         pass
     
-    class HumanMessage(BaseMessage):
-        def __init__(self, content):
-            self.content = content
+    async def _drain(self):
+        """Collect requests for up to one window and answer them with a single _run_batch call."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.window
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                responses = await self._run_batch([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+            
+            # A short result list must not leave the remaining callers waiting forever
+            for _, future in batch[len(responses):]:
+                if not future.done():
+                    future.set_exception(RuntimeError(
+                        f"Batch returned only {len(responses)} of {len(batch)} results"
+                    ))
+
+
+class CounselingBatcher(MicroBatcher):
+    """Coalesce concurrent counseling prompts into micro-batches sent with llm.abatch."""
+    
+    def __init__(self, llm, window: float = 0.05, max_batch_size: int = 16, max_concurrency: int = 10):
+        """Initialize the batcher for an LLM with a collection window in seconds."""
+        super().__init__(window, max_batch_size)
+        self.llm = llm
+        # Upper bound on requests the LLM client keeps in flight for one batch
+        self.max_concurrency = max_concurrency
+    
+    async def _run_batch(self, items: list) -> list:
+        return await self.llm.abatch(items, config={"max_concurrency": self.max_concurrency})
+
+
+class EmbeddingBatcher(MicroBatcher):
+    """Coalesce concurrent questions into one encoder call, run in a worker thread."""
     
-    class AIMessage(BaseMessage):
-        def __init__(self, content):
-            self.content = content
+    def __init__(self, encoder, window: float = 0.01, max_batch_size: int = 32):
+        """Initialize the batcher for a sentence encoder with a collection window in seconds."""
+        super().__init__(window, max_batch_size)
+        self.encoder = encoder
     
-    LANGCHAIN_AVAILABLE = False
+    async def _run_batch(self, items: list) -> list:
+        return list(await asyncio.to_thread(
+            self.encoder.encode, items, batch_size=len(items), normalize_embeddings=True
+        ))
+
+
+# Static counselor instructions, kept byte-identical across requests for prompt caching
+COUNSELING_SYSTEM_PROMPT = """You are a professional career counselor with expertise in UAE job market and career development.
+You provide personalized, empathetic, and actionable career advice.
+
+COUNSELING GUIDELINES:
+- Be empathetic and supportive in your tone
+- Provide specific, actionable advice tailored to UAE job market
+- Consider the applicant's background, education, and experience
+- Ask clarifying questions when needed
+- Offer both short-term and long-term career strategies
+- Include cultural considerations for UAE workplace
+- Be encouraging while being realistic about challenges
+- Suggest concrete next steps
+
+Respond as a caring, professional career counselor would."""
+
+# Per-request counseling input, placed after the static prefix
+COUNSELING_USER_PROMPT = """APPLICANT CONTEXT:
+{applicant_context}
+
+CONVERSATION HISTORY:
+{conversation_history}
+
+USER QUERY:
+{user_query}"""
+
+# Instructions for folding older conversation turns into the rolling summary
+HISTORY_SUMMARY_PROMPT = """You maintain a running summary of a career counseling conversation.
+Merge the previous summary and the new exchanges into at most 3 short bullet points covering the
+user's goals, relevant background facts, and advice already given. Reply with the bullets only."""
+
+# Process-wide counseling LLMs, one per model name, so every session shares one HTTP connection pool
+_LLM_CLIENTS: Dict[str, Any] = {}
+
+
+def _enable_llm_cache():
+    """Persist LLM answers in the SQLite file named by LLM_CACHE_DB, if set.
+    
+    Identical prompts are then answered from disk, across sessions and restarts.
+    """
+    path = os.getenv("LLM_CACHE_DB")
+    if not path:
+        return
+    
+    try:
+        from langchain_core.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+    except ImportError:
+        print("Info: LangChain SQLite cache not available - LLM answers are not persisted")
+        return
+    
+    set_llm_cache(SQLiteCache(database_path=path))
+
+
+def _get_llm(api_key: str, model_name: str = "gpt-3.5-turbo"):
+    """Return the shared counseling ChatOpenAI client for a model, creating it on first use."""
+    if not _LLM_CLIENTS:
+        _enable_llm_cache()
+    
+    if model_name not in _LLM_CLIENTS:
+        langchain = _load_langchain()
+        client_kwargs = {}
+        if langchain.openai_available:
+            # httpx ships with the openai SDK; size the pool for bursty concurrent sessions
+            import httpx
+            limits = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+            client_kwargs = {
+                'http_client': httpx.Client(limits=limits),
+                'http_async_client': httpx.AsyncClient(limits=limits)
+            }
+        
+        _LLM_CLIENTS[model_name] = langchain.ChatOpenAI(
+            model_name=model_name,
+            temperature=0.7,
+            # Cap the answer length, which bounds the time to the last token
+            max_tokens=int(os.getenv("COUNSELING_MAX_TOKENS", "400")),
+            openai_api_key=api_key,
+            **client_kwargs
+        )
+    return _LLM_CLIENTS[model_name]
+
+
+_BATCHERS: Dict[str, CounselingBatcher] = {}
+
+
+def _get_batcher(model_name: str, llm) -> CounselingBatcher:
+    """Return the shared batcher for a model, so requests from all sessions are coalesced."""
+    if model_name not in _BATCHERS:
+        _BATCHERS[model_name] = CounselingBatcher(
+            llm, max_concurrency=int(os.getenv("LLM_BATCH_MAX_CONCURRENCY", "10"))
+        )
+    return _BATCHERS[model_name]
+
+
+_BACKGROUND_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_BACKGROUND_LOOP_LOCK = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the long-lived event loop that synchronous callers run async work on.
+    
+    The shared counseling clients keep async HTTP connections bound to the loop that
+    first used them, so a fresh asyncio.run loop per call would find them closed.
+    """
+    global _BACKGROUND_LOOP
+    with _BACKGROUND_LOOP_LOCK:
+        if _BACKGROUND_LOOP is None:
+            _BACKGROUND_LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_BACKGROUND_LOOP.run_forever, name="chatbot-async", daemon=True).start()
+    return _BACKGROUND_LOOP
+
+
+def _format_previous_companies(employment_history) -> Optional[str]:
+    """Summarize previous employers when there is more than one position."""
+    if len(employment_history) > 1:
+        companies = ', '.join(job.get('company', 'Unknown') for job in islice(employment_history, 3))
+        return f"Previous Companies: {companies}"
+    return None
+
+
+def _format_key_skills(skills) -> Optional[str]:
+    """Show the top 5 skills."""
+    if isinstance(skills, list) and skills:
+        return f"Key Skills: {', '.join(islice(skills, 5))}"
+    return None
 
 
 class CareerCounselingTool:
     """AI-powered career counseling tool using OpenAI LLM."""
     
+    # Model tiers: (tier, env variable naming the model, default model). Short questions
+    # go to the fast tier, longer ones to the detailed tier.
+    MODEL_TIERS = (
+        ('fast', 'COUNSELING_FAST_MODEL', 'gpt-3.5-turbo'),
+        ('detailed', 'COUNSELING_DETAILED_MODEL', 'gpt-4o-mini')
+    )
+    # Queries with fewer words than this are answered by the fast tier
+    FAST_TIER_MAX_WORDS = 20
+    
     def __init__(self):
         """Initialize the career counseling tool with OpenAI LLM."""
         self.available = False
-        
-        if not LANGCHAIN_AVAILABLE:
+        self.batcher = None
+        self.llms = {}
+        self.counseling_chains = {}
+        self.batchers = {}
+        self._advice_matcher = KeywordMatcher(self.ADVICE_KEYWORDS)
+        # Counselor answers keyed by the exact prompt inputs (query, context, history)
+        self.response_cache = LRUCache(512)
+        # Rolling summaries of the turns older than the verbatim history window, keyed by the
+        # id of the conversation, as [conversation, summary, last summarized entry].
+        # Holding the conversation keeps its id from being reused while the entry is cached.
+        self._history_summaries = LRUCache(256)
+        
+        _ensure_env()
+        langchain = _load_langchain()
+        if not langchain:
             print("Info: LangChain not available - using intelligent counseling fallback")
             return
         
@@ -84,48 +624,36 @@ class CareerCounselingTool:
                 print("Info: OpenAI API key not found - using intelligent counseling fallback")
                 return
             
-            # Initialize OpenAI LLM
-            self.llm = ChatOpenAI(
-                model_name="gpt-3.5-turbo",
-                temperature=0.7,
-                openai_api_key=api_key
-            )
+            # Coalesce concurrent counseling LLM calls into llm.abatch micro-batches (opt-in,
+            # since not every serving backend supports batched requests)
+            batching = os.getenv("ENABLE_LLM_BATCHING", "false").lower() == "true"
             
-            # Create counseling prompt template
-            self.counseling_prompt = PromptTemplate(
-                input_variables=["user_query", "applicant_context", "conversation_history"],
-                template="""
-You are a professional career counselor with expertise in UAE job market and career development. 
-You provide personalized, empathetic, and actionable career advice.
-
-APPLICANT CONTEXT:
-{applicant_context}
-
-CONVERSATION HISTORY:
-{conversation_history}
-
-USER QUERY:
-{user_query}
-
-COUNSELING GUIDELINES:
-- Be empathetic and supportive in your tone
-- Provide specific, actionable advice tailored to UAE job market
-- Consider the applicant's background, education, and experience
-- Ask clarifying questions when needed
-- Offer both short-term and long-term career strategies
-- Include cultural considerations for UAE workplace
-- Be encouraging while being realistic about challenges
-- Suggest concrete next steps
-
-Respond as a caring, professional career counselor would:
-"""
-            )
+            # Reuse the process-wide OpenAI LLM for each model tier
+            for tier, env_var, default_model in self.MODEL_TIERS:
+                model_name = os.getenv(env_var, default_model)
+                self.llms[tier] = _get_llm(api_key, model_name)
+                if batching:
+                    self.batchers[tier] = _get_batcher(model_name, self.llms[tier])
             
-            # Create LLM chain
-            self.counseling_chain = LLMChain(
-                llm=self.llm,
-                prompt=self.counseling_prompt
-            )
+            # The fast tier also handles housekeeping calls such as history summaries
+            self.llm = self.llms['fast']
+            self.batcher = self.batchers.get('fast')
+            
+            # Create counseling prompt template. All static instructions form the system
+            # message and the per-request fields come last, so providers can cache the
+            # identical prompt prefix across requests.
+            self.counseling_prompt = langchain.ChatPromptTemplate.from_messages([
+                ("system", COUNSELING_SYSTEM_PROMPT),
+                ("human", COUNSELING_USER_PROMPT)
+            ])
+            
+            # Create an LLM chain per tier
+            for tier, llm in self.llms.items():
+                self.counseling_chains[tier] = langchain.LLMChain(
+                    llm=llm,
+                    prompt=self.counseling_prompt
+                )
+            self.counseling_chain = self.counseling_chains['fast']
             
             self.available = True
             print("✅ OpenAI career counselor initialized successfully")
@@ -134,30 +662,177 @@ Respond as a caring, professional career counselor would:
             print(f"Info: OpenAI not available for career counseling: {str(e)}")
             self.available = False
     
+    def model_tier(self, user_query: str) -> str:
+        """Pick the model tier for a query: short questions go to the fast model."""
+        return 'fast' if len(user_query.split()) < self.FAST_TIER_MAX_WORDS else 'detailed'
+    
     def provide_counseling(self, user_query: str, applicant_context: dict = None, conversation_history: list = None) -> str:
         """Provide AI-powered career counseling."""
         if not self.available:
             return self._fallback_counseling(user_query, applicant_context)
         
         try:
-            # Format applicant context
+            # Format applicant context and conversation history
+            self._update_history_summary(conversation_history)
+            context_str = self._format_applicant_context(applicant_context)
+            history_str = self._format_conversation_history(conversation_history)
+            
+            # Reuse the answer to an identical prompt
+            cache_key = (user_query, context_str, history_str)
+            response = self.response_cache.get(cache_key)
+            if response is None:
+                # Generate counseling response
+                response = self.counseling_chains[self.model_tier(user_query)].run(
+                    user_query=user_query,
+                    applicant_context=context_str,
+                    conversation_history=history_str
+                )
+                self.response_cache.put(cache_key, response)
+            
+            return self._format_counseling_response(response)
+        
+        except Exception as e:
+            print(f"Error in career counseling: {str(e)}")
+            return self._fallback_counseling(user_query, applicant_context)
+    
+    async def aprovide_counseling(self, user_query: str, applicant_context: dict = None, conversation_history: list = None) -> str:
+        """Provide AI-powered career counseling without blocking the event loop on the LLM call."""
+        if not self.available:
+            return self._fallback_counseling(user_query, applicant_context)
+        
+        try:
+            await asyncio.to_thread(self._update_history_summary, conversation_history)
             context_str = self._format_applicant_context(applicant_context)
+            history_str = self._format_conversation_history(conversation_history)
+            
+            # Reuse the answer to an identical prompt
+            cache_key = (user_query, context_str, history_str)
+            response = self.response_cache.get(cache_key)
+            if response is None:
+                messages = self.counseling_prompt.format_messages(
+                    user_query=user_query,
+                    applicant_context=context_str,
+                    conversation_history=history_str
+                )
+                
+                tier = self.model_tier(user_query)
+                if tier in self.batchers:
+                    response = (await self.batchers[tier].submit(messages)).content
+                else:
+                    response = (await self.llms[tier].ainvoke(messages)).content
+                self.response_cache.put(cache_key, response)
             
-            # Format conversation history
+            return self._format_counseling_response(response)
+        
+        except Exception as e:
+            print(f"Error in career counseling: {str(e)}")
+            return self._fallback_counseling(user_query, applicant_context)
+    
+    def stream_counseling(self, user_query: str, applicant_context: dict = None, conversation_history: list = None) -> Iterator[str]:
+        """Provide AI-powered career counseling, yielding the answer as the LLM generates it."""
+        if not self.available:
+            yield self._fallback_counseling(user_query, applicant_context)
+            return
+        
+        try:
+            self._update_history_summary(conversation_history)
+            context_str = self._format_applicant_context(applicant_context)
             history_str = self._format_conversation_history(conversation_history)
             
-            # Generate counseling response
-            response = self.counseling_chain.run(
+            # Reuse the answer to an identical prompt
+            cache_key = (user_query, context_str, history_str)
+            response = self.response_cache.get(cache_key)
+            if response is not None:
+                yield self._format_counseling_response(response)
+                return
+            
+            messages = self.counseling_prompt.format_messages(
                 user_query=user_query,
                 applicant_context=context_str,
                 conversation_history=history_str
             )
             
-            return f"""
+            # Wait for the first token so connection errors can still fall back cleanly
+            chunks = self.llms[self.model_tier(user_query)].stream(messages)
+            first = next(chunks, None)
+        
+        except Exception as e:
+            print(f"Error in career counseling: {str(e)}")
+            yield self._fallback_counseling(user_query, applicant_context)
+            return
+        
+        yield self._RESPONSE_HEADER
+        parts = []
+        if first is not None:
+            parts.append(first.content)
+            yield first.content
+        try:
+            for chunk in chunks:
+                parts.append(chunk.content)
+                yield chunk.content
+        except Exception as e:
+            print(f"Error in career counseling: {str(e)}")
+        else:
+            # Only complete answers are reused
+            self.response_cache.put(cache_key, "".join(parts))
+        yield self._RESPONSE_FOOTER
+    
+    async def astream_counseling(self, user_query: str, applicant_context: dict = None, conversation_history: list = None) -> AsyncIterator[str]:
+        """Provide AI-powered career counseling, yielding the answer as the LLM generates it without blocking the event loop."""
+        if not self.available:
+            yield self._fallback_counseling(user_query, applicant_context)
+            return
+        
+        try:
+            await asyncio.to_thread(self._update_history_summary, conversation_history)
+            context_str = self._format_applicant_context(applicant_context)
+            history_str = self._format_conversation_history(conversation_history)
+            
+            # Reuse the answer to an identical prompt
+            cache_key = (user_query, context_str, history_str)
+            response = self.response_cache.get(cache_key)
+            if response is not None:
+                yield self._format_counseling_response(response)
+                return
+            
+            messages = self.counseling_prompt.format_messages(
+                user_query=user_query,
+                applicant_context=context_str,
+                conversation_history=history_str
+            )
+            
+            # Wait for the first token so connection errors can still fall back cleanly
+            chunks = self.llms[self.model_tier(user_query)].astream(messages)
+            first = await anext(chunks, None)
+        
+        except Exception as e:
+            print(f"Error in career counseling: {str(e)}")
+            yield self._fallback_counseling(user_query, applicant_context)
+            return
+        
+        yield self._RESPONSE_HEADER
+        parts = []
+        if first is not None:
+            parts.append(first.content)
+            yield first.content
+        try:
+            async for chunk in chunks:
+                parts.append(chunk.content)
+                yield chunk.content
+        except Exception as e:
+            print(f"Error in career counseling: {str(e)}")
+        else:
+            # Only complete answers are reused
+            self.response_cache.put(cache_key, "".join(parts))
+        yield self._RESPONSE_FOOTER
+    
+    # Session layout around the counselor's answer
+    _RESPONSE_HEADER = f"""
 🧠 **CAREER COUNSELING SESSION**
 {'=' * 50}
 
-{response}
+"""
+    _RESPONSE_FOOTER = """
 
 💡 **Next Steps:**
 • Reflect on the advice provided
@@ -167,10 +842,26 @@ Respond as a caring, professional career counselor would:
 
 🤝 **Remember:** Career development is a journey, and I'm here to support you every step of the way.
 """
-        
-        except Exception as e:
-            print(f"Error in career counseling: {str(e)}")
-            return self._fallback_counseling(user_query, applicant_context)
+    
+    def _format_counseling_response(self, response: str) -> str:
+        """Wrap the counselor's answer in the session layout."""
+        return self._RESPONSE_HEADER + response + self._RESPONSE_FOOTER
+    
+    # Applicant context lines, in prompt order: (keys, format, fallback keys, fallback format).
+    # A line is emitted when all of its keys are truthy, otherwise the fallback is tried.
+    # Formats are str.format templates or callables returning a line (or None to skip).
+    _CONTEXT_FIELDS = (
+        (('full_name',), "Name: {}", ('name',), "Name: {}"),
+        (('location',), "Location: {}", None, None),
+        (('current_position', 'current_company'), "Current Role: {} at {}", ('current_job',), "Current Role: {}"),
+        (('total_experience_years',), "Total Experience: {} years", ('experience_years',), "Experience: {} years"),
+        (('highest_degree', 'institution'), "Education: {} from {}", ('education',), "Education: {}"),
+        (('employment_history',), _format_previous_companies, None, None),
+        (('skills',), _format_key_skills, None, None),
+        (('application_status',), "Application Status: {}", None, None),
+        (('requested_amount',), "Support Requested: AED {:,}", None, None),
+        (('age',), "Age: {}", None, None)
+    )
     
     def _format_applicant_context(self, applicant_context: dict) -> str:
         """Format applicant context for the prompt."""
@@ -179,102 +870,100 @@ Respond as a caring, professional career counselor would:
         
         context_parts = []
         
-        # Basic information
-        if applicant_context.get('full_name') or applicant_context.get('name'):
-            name = applicant_context.get('full_name') or applicant_context.get('name')
-            context_parts.append(f"Name: {name}")
-        
-        if applicant_context.get('location'):
-            context_parts.append(f"Location: {applicant_context['location']}")
-        
-        # Current employment
-        if applicant_context.get('current_position') and applicant_context.get('current_company'):
-            context_parts.append(f"Current Role: {applicant_context['current_position']} at {applicant_context['current_company']}")
-        elif applicant_context.get('current_job'):
-            context_parts.append(f"Current Role: {applicant_context['current_job']}")
-        
-        # Experience
-        if applicant_context.get('total_experience_years'):
-            context_parts.append(f"Total Experience: {applicant_context['total_experience_years']} years")
-        elif applicant_context.get('experience_years'):
-            context_parts.append(f"Experience: {applicant_context['experience_years']} years")
-        
-        # Education
-        if applicant_context.get('highest_degree') and applicant_context.get('institution'):
-            context_parts.append(f"Education: {applicant_context['highest_degree']} from {applicant_context['institution']}")
-        elif applicant_context.get('education'):
-            context_parts.append(f"Education: {applicant_context['education']}")
-        
-        # Employment history summary
-        if applicant_context.get('employment_history'):
-            employment_history = applicant_context['employment_history']
-            if len(employment_history) > 1:
-                companies = [job.get('company', 'Unknown') for job in employment_history[:3]]
-                context_parts.append(f"Previous Companies: {', '.join(companies)}")
-        
-        # Skills
-        if applicant_context.get('skills'):
-            skills = applicant_context['skills']
-            if isinstance(skills, list) and skills:
-                context_parts.append(f"Key Skills: {', '.join(skills[:5])}")  # Show top 5 skills
-        
-        # Application context
-        if applicant_context.get('application_status'):
-            context_parts.append(f"Application Status: {applicant_context['application_status']}")
-        
-        if applicant_context.get('requested_amount'):
-            context_parts.append(f"Support Requested: AED {applicant_context['requested_amount']:,}")
-        
-        # Age if available
-        if applicant_context.get('age'):
-            context_parts.append(f"Age: {applicant_context['age']}")
+        for keys, fmt, fallback_keys, fallback_fmt in self._CONTEXT_FIELDS:
+            values = [applicant_context.get(key) for key in keys]
+            if not all(values):
+                if not fallback_keys:
+                    continue
+                values = [applicant_context.get(key) for key in fallback_keys]
+                if not all(values):
+                    continue
+                fmt = fallback_fmt
+            
+            line = fmt(*values) if callable(fmt) else fmt.format(*values)
+            if line:
+                context_parts.append(line)
         
         return "\n".join(context_parts) if context_parts else "General career counseling request."
     
+    # History entries quoted verbatim in the prompt (last 3 exchanges), and how many older
+    # entries (4 exchanges) are folded into the rolling summary per LLM call
+    _HISTORY_WINDOW = 6
+    _SUMMARY_BATCH = 8
+    
     def _format_conversation_history(self, conversation_history: list) -> str:
         """Format conversation history for context."""
         if not conversation_history or len(conversation_history) < 2:
             return "This is the start of our conversation."
         
-        # Get last few exchanges for context
-        recent_history = conversation_history[-6:]  # Last 3 exchanges
+        # Get last few exchanges for context (histories may be deques, which do not slice)
+        start = max(len(conversation_history) - self._HISTORY_WINDOW, 0)
+        formatted = self._format_history_entries(islice(conversation_history, start, None))
+        
+        # Older turns are represented by their summary, once there is one
+        state = self._history_summaries.get(id(conversation_history))
+        if state and state[0] is conversation_history and state[1]:
+            return f"Summary of earlier conversation:\n{state[1]}\n\nRecent exchanges:\n{formatted}"
+        
+        return formatted
+    
+    def _format_history_entries(self, entries: list) -> str:
+        """Format history entries as 'User: ...' / 'Counselor: ...' lines."""
         formatted = []
         
-        for entry in recent_history:
+        for entry in entries:
             role = "User" if entry.get('role') == 'user' else "Counselor"
             content = entry.get('content', '')[:200]  # Limit length
             formatted.append(f"{role}: {content}")
         
         return "\n".join(formatted)
     
-    def _fallback_counseling(self, user_query: str, applicant_context: dict = None) -> str:
-        """Intelligent fallback counseling when OpenAI is not available."""
-        # Create a more intelligent fallback based on query analysis
-        query_lower = user_query.lower()
-        
-        # Analyze the type of career concern
-        if any(word in query_lower for word in ['stuck', 'confused', 'lost', 'direction']):
-            advice_type = "career_direction"
-        elif any(word in query_lower for word in ['change', 'switch', 'transition']):
-            advice_type = "career_change"
-        elif any(word in query_lower for word in ['growth', 'promotion', 'advance']):
-            advice_type = "career_growth"
-        elif any(word in query_lower for word in ['skills', 'learn', 'develop']):
-            advice_type = "skill_development"
-        else:
-            advice_type = "general"
+    def _update_history_summary(self, conversation_history: list):
+        """Fold turns that have left the verbatim window into the rolling summary, a batch at a time."""
+        if not conversation_history:
+            return
         
-        # Get applicant context
-        name = applicant_context.get('name', 'there') if applicant_context else 'there'
-        current_job = applicant_context.get('current_job', 'your current role') if applicant_context else 'your current role'
-        experience = applicant_context.get('experience_years', 0) if applicant_context else 0
+        state = self._history_summaries.get(id(conversation_history))
+        if state is None or state[0] is not conversation_history:
+            # A new (or reset) conversation starts without a summary
+            state = [conversation_history, None, None]
+        
+        older = list(islice(conversation_history, max(len(conversation_history) - self._HISTORY_WINDOW, 0)))
+        # Bounded histories drop their oldest entries, so resume after the last summarized
+        # entry rather than at a fixed index; once it has been dropped, every older entry is new
+        start = 0
+        for i in range(len(older) - 1, -1, -1):
+            if older[i] is state[2]:
+                start = i + 1
+                break
+        if len(older) - start < self._SUMMARY_BATCH:
+            return
         
-        # Generate contextual advice
-        advice = self._generate_contextual_advice(advice_type, name, current_job, experience, user_query)
+        exchanges = self._format_history_entries(older[start:])
+        try:
+            summary = self.llm.invoke([
+                ("system", HISTORY_SUMMARY_PROMPT),
+                ("human", f"PREVIOUS SUMMARY:\n{state[1] or 'None'}\n\nNEW EXCHANGES:\n{exchanges}")
+            ]).content
+        except Exception as e:
+            print(f"Error summarizing conversation history: {str(e)}")
+            return
         
-        return f"""
+        self._history_summaries.put(id(conversation_history), [conversation_history, summary.strip(), older[-1]])
+    
+    # Career concern types for fallback advice, in priority order, with the words
+    # (matched as substrings of the lowercased query) that signal them
+    ADVICE_KEYWORDS = (
+        ('career_direction', ['stuck', 'confused', 'lost', 'direction']),
+        ('career_change', ['change', 'switch', 'transition']),
+        ('career_growth', ['growth', 'promotion', 'advance']),
+        ('skill_development', ['skills', 'learn', 'develop'])
+    )
+    
+    # Session layout for fallback advice; str.format template so the body is built once
+    _FALLBACK_TEMPLATE = """
 � ***CAREER COUNSELING SESSION**
-{'=' * 50}
+""" + '=' * 50 + """
 
 Hello {name}! I understand you're asking: "{user_query}"
 
@@ -294,11 +983,31 @@ Hello {name}! I understand you're asking: "{user_query}"
 **Remember:** Every career journey has challenges, but with the right strategy and persistence, you can achieve your goals. I'm here to support you every step of the way.
 """
     
-    def _generate_contextual_advice(self, advice_type: str, name: str, current_job: str, experience: int, query: str) -> str:
-        """Generate contextual career advice based on the situation."""
+    def _fallback_counseling(self, user_query: str, applicant_context: dict = None) -> str:
+        """Intelligent fallback counseling when OpenAI is not available."""
+        # Create a more intelligent fallback based on query analysis
+        query_lower = user_query.lower()
         
-        if advice_type == "career_direction":
-            return f"""
+        # Analyze the type of career concern (first matching type in priority order)
+        concerns = self._advice_matcher.match(query_lower)
+        advice_type = next((advice for advice, _ in self.ADVICE_KEYWORDS if advice in concerns), "general")
+        
+        # Get applicant context
+        context = applicant_context or {}
+        name = context.get('name', 'there')
+        current_job = context.get('current_job', 'your current role')
+        experience = context.get('experience_years', 0)
+        
+        # Generate contextual advice
+        advice = self._generate_contextual_advice(advice_type, name, current_job, experience, user_query)
+        
+        return self._FALLBACK_TEMPLATE.format(
+            name=name, user_query=user_query, advice=advice, current_job=current_job
+        )
+    
+    # Fallback advice bodies per career concern type, as str.format templates
+    _ADVICE_TEMPLATES = {
+        'career_direction': """
 **Finding Your Career Direction:**
 
 It's completely normal to feel uncertain about your career path, especially in today's rapidly changing job market. Here's my guidance:
@@ -314,10 +1023,8 @@ It's completely normal to feel uncertain about your career path, especially in t
 • Consider informational interviews to learn about different paths
 
 📈 **With {experience} years of experience, you have valuable insights to offer. Use this as a foundation to explore adjacent opportunities.**
-"""
-        
-        elif advice_type == "career_change":
-            return f"""
+""",
+        'career_change': """
 **Career Transition Guidance:**
 
 Career changes can be both exciting and challenging. Here's a strategic approach:
@@ -334,10 +1041,8 @@ Career changes can be both exciting and challenging. Here's a strategic approach
 • Update your personal brand (LinkedIn, CV) to reflect new direction
 
 💪 **With {experience} years of experience, you have a strong foundation. Many skills are transferable across industries.**
-"""
-        
-        elif advice_type == "career_growth":
-            return f"""
+""",
+        'career_growth': """
 **Career Advancement Strategy:**
 
 Growth opportunities exist even in challenging times. Here's how to position yourself:
@@ -354,10 +1059,8 @@ Growth opportunities exist even in challenging times. Here's how to position you
 • Look for opportunities to lead projects or mentor others
 
 📊 **In the UAE market, professionals with {experience} years of experience are well-positioned for senior roles. Focus on demonstrating business impact.**
-"""
-        
-        elif advice_type == "skill_development":
-            return f"""
+""",
+        'skill_development': """
 **Skill Development Strategy:**
 
 Continuous learning is essential in today's economy. Here's your development plan:
@@ -373,10 +1076,8 @@ Continuous learning is essential in today's economy. Here's your development pla
 • Find a mentor who can guide your development
 
 🔧 **Given your background in {current_job}, focus on skills that complement your existing expertise while opening new opportunities.**
-"""
-        
-        else:  # general advice
-            return f"""
+""",
+        'general': """
 **General Career Guidance:**
 
 Career development is a journey, not a destination. Here's my holistic advice:
@@ -398,155 +1099,626 @@ Career development is a journey, not a destination. Here's my holistic advice:
 
 **Your {experience} years of experience give you a solid foundation. Focus on leveraging this while remaining open to new opportunities.**
 """
+    }
+    
+    def _generate_contextual_advice(self, advice_type: str, name: str, current_job: str, experience: int, query: str) -> str:
+        """Generate contextual career advice based on the situation."""
+        template = self._ADVICE_TEMPLATES.get(advice_type, self._ADVICE_TEMPLATES['general'])
+        return template.format(name=name, current_job=current_job, experience=experience)
+
+
+# Messages kept per conversation (10 exchanges); older turns survive only in the rolling summary
+MAX_HISTORY_MESSAGES = 20
+
+
+@dataclass
+class Session:
+    """Per-conversation state, kept apart from the router so one router and its tools can serve many sessions."""
+    applicant_data: Optional[dict] = None
+    history: deque = field(default_factory=lambda: deque(maxlen=MAX_HISTORY_MESSAGES))
+
+
+class RedisSessionStore:
+    """Conversation history and applicant data kept in Redis, keyed by session ID.
+    
+    Lets any worker process serve any conversation and keeps conversations across restarts.
+    Each save bumps a revision counter, so workers only rebuild history that changed elsewhere.
+    """
+    
+    __slots__ = ('client',)
+    
+    # Applicant context expires after 10 idle minutes, the conversation after a day
+    APPLICANT_TTL = 600
+    HISTORY_TTL = 86400
+    
+    def __init__(self, client):
+        self.client = client
+    
+    @staticmethod
+    def _keys(session_id: str) -> Tuple[str, str, str]:
+        """Redis keys of a session's history, applicant data and revision."""
+        return f"hist:{session_id}", f"app:{session_id}", f"rev:{session_id}"
+    
+    def load(self, session_id: str) -> Tuple[Optional[int], List[bytes], Optional[bytes]]:
+        """Return (revision, JSON messages, applicant JSON) in one round-trip."""
+        hist_key, app_key, rev_key = self._keys(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(rev_key)
+        pipe.lrange(hist_key, 0, -1)
+        pipe.get(app_key)
+        revision, messages, applicant_raw = pipe.execute()
+        return (int(revision) if revision is not None else None), messages, applicant_raw
+    
+    def save_turn(self, session_id: str, messages: List[dict], max_history: int, applicant_raw: Optional[str]) -> int:
+        """Append a turn's messages and store the applicant data in one round-trip; returns the new revision."""
+        hist_key, app_key, rev_key = self._keys(session_id)
+        pipe = self.client.pipeline()
+        pipe.rpush(hist_key, *(json.dumps(message) for message in messages))
+        pipe.ltrim(hist_key, -max_history, -1)
+        pipe.expire(hist_key, self.HISTORY_TTL)
+        if applicant_raw is None:
+            pipe.delete(app_key)
+        else:
+            pipe.setex(app_key, self.APPLICANT_TTL, applicant_raw)
+        pipe.incr(rev_key)
+        pipe.expire(rev_key, self.HISTORY_TTL)
+        return pipe.execute()[-2]
+    
+    def clear(self, session_id: str) -> int:
+        """Forget a conversation; returns the new revision."""
+        hist_key, app_key, rev_key = self._keys(session_id)
+        pipe = self.client.pipeline()
+        pipe.delete(hist_key, app_key)
+        pipe.incr(rev_key)
+        pipe.expire(rev_key, self.HISTORY_TTL)
+        return pipe.execute()[-2]
+
+
+# Conversations stay in process memory unless REDIS_URL is set. None means not probed
+# yet, False means conversations are not shared.
+_SESSION_STORE = None
+
+
+def _get_session_store():
+    """Return the process-wide RedisSessionStore, or False when REDIS_URL is unset or redis is missing."""
+    global _SESSION_STORE
+    if _SESSION_STORE is None:
+        _ensure_env()
+        _SESSION_STORE = False
+        url = os.getenv("REDIS_URL")
+        if url:
+            try:
+                import redis
+                _SESSION_STORE = RedisSessionStore(redis.Redis.from_url(url))
+            except ImportError:
+                print("⚠️ REDIS_URL is set but the redis package is not installed; keeping conversations in memory")
+    return _SESSION_STORE
+
+
+def shared_sessions_enabled() -> bool:
+    """Whether conversations are shared between processes through the session store."""
+    return bool(_get_session_store())
 
 
 class IntelligentRouter:
-    """Intelligent router for determining which tool to use based on user input."""
+    """Intelligent router for determining which tool to use based on user input.
+    
+    The router holds only tools and shared caches; per-conversation state lives in the
+    Session passed to each query.
+    """
+    
+    __slots__ = (
+        '_db_tool', '_job_tool', '_course_tool', '_counseling_tool',
+        '_intent_matcher', '_skill_matcher', '_status_cache', '_workflow_context_cache',
+        '_workflow_index', '_workflow_index_mtime', '_workflow_matches', '_search_cache',
+        '_tools_lock'
+    )
+    
+    # Career fields: they steer searches, and only call for the counselor when no search
+    # tool can answer instead
+    TOPIC_KEYWORDS = ('data science', 'product management', 'ai field')
+    
+    # Routing keywords per intent, matched as substrings of the lowercased input
+    INTENT_KEYWORDS = (
+        ('job_search', [
+            'find job', 'job search', 'employment', 'work opportunities', 'career opportunities', 'looking for', 'positions'
+        ]),
+        # Career counseling is more personal/advice-oriented
+        ('career_counseling', [
+            'career advice', 'career counseling', 'career counselor', 'what should i do',
+            'career path', 'career change', 'career direction', 'career planning',
+            'feeling stuck', 'career confusion', 'career goals', 'professional advice',
+            'career transition', 'next step in career', 'career development advice',
+            'career strategy', 'career mentor', 'career coach', 'risks of switching',
+            'should i change', 'transition while working', 'prepare for transition',
+            'at my age', 'career switch', 'changing fields', 'new career',
+            'transitioning to', 'moving from', 'advance in', 'senior role',
+            'what skills should i', 'how can i advance', 'career options', 'switching to'
+        ]),
+        ('career_topic', list(TOPIC_KEYWORDS)),
+        # Career guidance is course/training focused
+        ('career_guidance', [
+            'course recommendation', 'training', 'skill development', 'what should i study', 'courses', 'learn', 'certification'
+        ]),
+        ('help', ['help', 'menu', 'options', 'what can you do'])
+    )
+    
+    # Job titles recognised in search requests, in priority order (first listed wins)
+    SKILL_KEYWORDS = (
+        'engineer', 'manager', 'consultant', 'supervisor', 'developer', 'analyst', 'coordinator',
+        'data scientist', 'software engineer'
+    )
+    
+    # Context-aware follow-up triggers, only used once an applicant is known.
+    # Single words are matched against the input tokens; the few multi-word
+    # phrases are only scanned for when no token matches.
+    _COUNSEL_TOKENS = frozenset({
+        'advice', 'counseling', 'confused', 'stuck', 'risk', 'risks',
+        'transition', 'transitions', 'transitioned', 'transitioning',
+        'switch', 'switches', 'switched', 'switching', 'change', 'changes', 'changed', 'changing',
+        'prepare', 'prepares', 'prepared', 'preparing'
+    })
+    _COUNSEL_PHRASES = ('what should', 'at my age', 'how can i')
+    _JOB_TOKENS = frozenset({
+        'job', 'jobs', 'work', 'works', 'worked', 'working', 'worker', 'workers',
+        'employment', 'unemployment', 'opportunity', 'opportunities'
+    })
+    _COURSE_TOKENS = frozenset({
+        'course', 'courses', 'training', 'trainings', 'study', 'studying',
+        'learn', 'learns', 'learned', 'learning', 'certification', 'certifications'
+    })
     
     def __init__(self):
         """Initialize the router with tools."""
-        self.db_tool = SimpleApplicationQuery()
-        self.job_tool = JobSearchTool()
-        self.course_tool = CourseRecommendationTool()
-        self.counseling_tool = CareerCounselingTool()
-        self.current_applicant_data = None
+        # Tool configs read credentials from the environment
+        _ensure_env()
+        # Tools are built on first use (see the properties below), so a session that only
+        # checks application status never sets up the search APIs or the LLM client
+        self._db_tool = None
+        self._job_tool = None
+        self._course_tool = None
+        self._counseling_tool = None
+        # Guards the lazy creation, since aroute_query runs handlers in worker threads
+        self._tools_lock = threading.Lock()
+        # One automaton covers every routing keyword: intent phrases are labelled with their
+        # intent and job titles and career fields with themselves, so a single pass per turn yields both
+        search_terms = self.SKILL_KEYWORDS + self.TOPIC_KEYWORDS
+        self._intent_matcher = KeywordMatcher(
+            self.INTENT_KEYWORDS + tuple((keyword, [keyword]) for keyword in search_terms)
+        )
+        self._skill_matcher = KeywordMatcher((keyword, [keyword]) for keyword in search_terms)
+        
+        # Formatted status reports keyed by (status file, mtime_ns); a rewritten file gets a new key
+        self._status_cache = LRUCache(maxsize=128)
+        
+        # Resume context derived from workflow_state.json, keyed by (file, mtime_ns)
+        self._workflow_context_cache = LRUCache(maxsize=64)
+        
+        # Snapshot of the ./workflow_outputs listing, rescanned when the directory's mtime changes
+        self._workflow_index = ()
+        self._workflow_index_mtime = None
+        self._workflow_matches = LRUCache(maxsize=256)
+        
+        # Job/course search results keyed by (tool, arguments); listings go stale, so they expire
+        self._search_cache = LRUCache(maxsize=256, ttl=3600)
+    
+    @property
+    def db_tool(self) -> SimpleApplicationQuery:
+        """Application database query tool, created on first use."""
+        if self._db_tool is None:
+            with self._tools_lock:
+                if self._db_tool is None:
+                    self._db_tool = SimpleApplicationQuery()
+        return self._db_tool
+    
+    @property
+    def job_tool(self) -> JobSearchTool:
+        """Job search tool, created on first use."""
+        if self._job_tool is None:
+            with self._tools_lock:
+                if self._job_tool is None:
+                    self._job_tool = JobSearchTool()
+        return self._job_tool
+    
+    @property
+    def course_tool(self) -> CourseRecommendationTool:
+        """Course recommendation tool, created on first use."""
+        if self._course_tool is None:
+            with self._tools_lock:
+                if self._course_tool is None:
+                    self._course_tool = CourseRecommendationTool()
+        return self._course_tool
+    
+    @property
+    def counseling_tool(self) -> CareerCounselingTool:
+        """AI career counseling tool, created on first use."""
+        if self._counseling_tool is None:
+            with self._tools_lock:
+                if self._counseling_tool is None:
+                    self._counseling_tool = CareerCounselingTool()
+        return self._counseling_tool
+    
+    # Async counterparts of handlers that await I/O instead of blocking
+    _ASYNC_HANDLERS = {
+        '_handle_career_counseling': '_ahandle_career_counseling',
+        '_handle_career_counseling_for_applicant': '_ahandle_career_counseling'
+    }
+    
+    # Streaming counterparts of handlers that yield their response as it is generated
+    _STREAM_HANDLERS = {
+        '_handle_career_counseling': '_stream_career_counseling',
+        '_handle_career_counseling_for_applicant': '_stream_career_counseling'
+    }
+    _ASYNC_STREAM_HANDLERS = {
+        '_handle_career_counseling': '_astream_career_counseling',
+        '_handle_career_counseling_for_applicant': '_astream_career_counseling'
+    }
+    
+    # Handlers that only read router state, so several may run concurrently in one turn
+    _CONCURRENCY_SAFE_HANDLERS = frozenset({
+        '_handle_job_search', '_handle_career_counseling', '_handle_career_guidance',
+        '_handle_job_search_for_applicant', '_handle_career_guidance_for_applicant'
+    })
+    
+    # Document fields shown under APPLICANT INFORMATION in the status report, in
+    # display order: (document key, ((field, default, format), ...))
+    _DOC_FIELDS = (
+        ('emirates_id', (
+            ('name', 'N/A', "📇 **Name:** {}"),
+            ('nationality', 'N/A', "🏴 **Nationality:** {}"),
+            ('age', 'N/A', "🎂 **Age:** {}"),
+            ('emirate', 'N/A', "🏙️ **Emirate:** {}")
+        )),
+        ('resume', (
+            ('current_employment', 'N/A', "💼 **Current Job:** {}"),
+            ('experience_years', 'N/A', "📅 **Experience:** {} years"),
+            ('monthly_salary', 'N/A', "💰 **Monthly Salary:** AED {:,}"),
+            ('employment_status', 'N/A', lambda value: f"📊 **Employment Status:** {value.title()}")
+        )),
+        ('bank_statement', (
+            ('average_balance', 0, "🏦 **Average Balance:** AED {:,}"),
+            ('financial_stability', 'N/A', lambda value: f"📈 **Financial Stability:** {value.title()}")
+        )),
+        ('credit_report', (
+            ('credit_score', 'N/A', "📊 **Credit Score:** {}"),
+            ('payment_history', 'N/A', lambda value: f"💳 **Payment History:** {value.title()}")
+        ))
+    )
+    
+    # Applicant context taken from a status file's document analysis:
+    # (document key, ((context key, source key, default), ...))
+    _APPLICANT_DOC_FIELDS = (
+        ('emirates_id', (
+            ('name', 'name', ''),
+            ('age', 'age', 0),
+            ('nationality', 'nationality', ''),
+            ('emirate', 'emirate', '')
+        )),
+        ('resume', (
+            ('current_job', 'current_employment', ''),
+            ('experience_years', 'experience_years', 0),
+            ('monthly_salary', 'monthly_salary', 0),
+            ('employment_status', 'employment_status', '')
+        )),
+        ('bank_statement', (
+            ('average_balance', 'average_balance', 0),
+            ('financial_stability', 'financial_stability', '')
+        ))
+    )
+    _LEGACY_APPLICANT_FIELDS = frozenset({'name', 'age', 'current_job', 'experience_years'})
+    
+    # Resume fields copied into the counseling context as (context key, source key)
+    _PERSONAL_INFO_FIELDS = (
+        ('full_name', 'name'),
+        ('email', 'email'),
+        ('phone', 'phone'),
+        ('location', 'address'),
+        ('linkedin', 'linkedin'),
+        ('nationality', 'nationality')
+    )
+    _CURRENT_JOB_FIELDS = (
+        ('current_company', 'company'),
+        ('current_position', 'position'),
+        ('current_job_description', 'description'),
+        ('employment_type', 'employment_type')
+    )
+    _HIGHEST_EDUCATION_FIELDS = (
+        ('highest_degree', 'degree'),
+        ('institution', 'institution'),
+        ('graduation_year', 'end_date')
+    )
+    # Raw resume text kept in the counseling context (longer text is truncated with "...")
+    _RESUME_SUMMARY_CHARS = 2000
+    # Workflow applicant_info fields as (key, default)
+    _APPLICANT_INFO_FIELDS = (
+        ('application_number', ''),
+        ('requested_amount', 0),
+        ('application_status', '')
+    )
     
-    def route_query(self, user_input: str, conversation_history: list = None) -> str:
+    # Static replies, built once instead of on every call
+    _HELP_MENU = """
+🤖 **HOW CAN I HELP YOU?**
+
+📋 **APPLICATION QUERIES:**
+• Check your application status and details
+• View approval information and amounts
+• See your complete profile information
+
+Just provide your Application ID (e.g., "APP-2025-000001")
+
+🔍 **JOB SEARCH ASSISTANCE:**
+• Find job opportunities based on your skills
+• Get salary ranges and company information
+• Receive application tips and advice
+
+💡 **CAREER GUIDANCE:**
+• Get course recommendations for skill development
+• Find training programs and certifications
+• Receive career advancement advice
+
+🧠 **CAREER COUNSELING:**
+• Get personalized career advice from AI counselor
+• Discuss career transitions and planning
+• Receive strategic career development guidance
+
+🎯 **SAMPLE APPLICATION IDs:**
+• APP-2025-000001 (Ahmed - Family Support)
+• APP-2025-000004 (Aisha - Approved ✅)
+"""
+    
+    _FOLLOW_UP_OPTIONS = """
+
+🎯 **WHAT WOULD YOU LIKE TO DO NEXT?**
+
+a) 🔍 **Job Search**: Find job opportunities based on your experience
+b) 📚 **Career Guidance**: Get course recommendations and training advice
+c) 🧠 **Career Counseling**: Get personalized career advice and planning
+d) ❓ **Other Questions**: Ask me anything else about your application
+
+Just tell me what you'd like to do! 😊
+"""
+    
+    # Replies that embed the help menu, assembled once as str.format templates
+    _NOT_FOUND_TEMPLATE = """
+❌ {result}
+
+💡 **Please check:**
+• Make sure the application ID is correct (format: APP-YYYY-XXXXXX or UUID)
+• Try these sample IDs:
+  - APP-2025-000001 (Ahmed Al Mansouri)
+  - APP-2025-000004 (Aisha Al Maktoum - Approved)
+  - dd33f590-f78f-491a-825f-d14614fc7b81 (Ahmed - Processed ✅)
+
+""" + _HELP_MENU + """
+"""
+    
+    _GENERAL_QUERY_TEMPLATE = """
+🤔 I understand you're asking about: "{user_input}"
+
+""" + _HELP_MENU + """
+
+💡 **Try these examples:**
+• "APP-2025-000001" - Check application status
+• "Help me find jobs" - Job search assistance
+• "I need career guidance" - Course recommendations
+"""
+    
+    _NO_PROCESSING_STATUS = """
+📊 **DOCUMENT PROCESSING STATUS**
+⏳ **Status:** No document processing found for this application
+💡 **Note:** Documents may not have been uploaded or processed yet
+"""
+    
+    _SUMMARY_STATUS_TEMPLATE = """
+📋 **APPLICATION SUMMARY**
+🆔 **Application ID:** {app_id}
+✅ **Status:** Processing completed
+📊 **Summary:** {summary}
+"""
+    
+    _JUDGMENT_STATUS_TEMPLATE = """
+📋 **APPLICATION JUDGMENT**
+🆔 **Application ID:** {app_id}
+⚖️ **Decision:** {decision}
+🎯 **Confidence:** {confidence}
+✅ **Status:** Final judgment completed
+"""
+    
+    _COUNSELING_ID_REQUEST_TEMPLATE = """
+🧠 **CAREER COUNSELING REQUEST**
+""" + '=' * 50 + """
+
+I'd be happy to provide personalized career counseling! However, to give you the most relevant and tailored advice, I need to understand your professional background first.
+
+**Please provide your Application ID** so I can:
+✅ Access your resume and work experience
+✅ Understand your skills and expertise
+✅ Review your career progression
+✅ Provide personalized recommendations
+
+📋 **Your Question:** "{user_input}"
+
+🆔 **How to proceed:**
+Simply share your Application ID (format: APP-YYYY-XXXXXX or UUID), and I'll provide detailed career counseling based on your actual professional profile.
+
+💡 **Example Application IDs:**
+• APP-2025-000001
+• dd33f590-f78f-491a-825f-d14614fc7b81
+• 68599245-48b5-4c20-b26f-5322e101b194
+
+Once you provide your Application ID, I'll analyze your resume and give you personalized career advice! 🚀
+"""
+    
+    def route_query(self, user_input: str, session: Session) -> str:
         """Route user query to appropriate tool and return response."""
+        handler, args = self._select_routes(user_input, session)[0]
+        return handler(*args)
+    
+    async def aroute_query(self, user_input: str, session: Session) -> str:
+        """Route user query asynchronously, answering multi-intent queries with concurrent tool calls."""
+        return await self._arun_routes(self._select_routes(user_input, session))
+    
+    def stream_query(self, user_input: str, session: Session) -> Iterator[str]:
+        """Route user query like route_query, yielding the response in chunks as it is generated."""
+        handler, args = self._select_routes(user_input, session)[0]
+        stream_handler = self._STREAM_HANDLERS.get(handler.__name__)
+        if stream_handler:
+            yield from getattr(self, stream_handler)(*args)
+        else:
+            yield handler(*args)
+    
+    async def astream_query(self, user_input: str, session: Session) -> AsyncIterator[str]:
+        """Route user query like aroute_query, yielding the response in chunks as it is generated."""
+        routes = self._select_routes(user_input, session)
+        handler, args = routes[0]
+        stream_handler = self._ASYNC_STREAM_HANDLERS.get(handler.__name__)
+        if stream_handler:
+            async for chunk in getattr(self, stream_handler)(*args):
+                yield chunk
+        else:
+            yield await self._arun_routes(routes)
+    
+    async def _arun_routes(self, routes: list) -> str:
+        """Answer the selected routes, running multi-intent tool calls concurrently."""
+        if len(routes) > 1 and all(handler.__name__ in self._CONCURRENCY_SAFE_HANDLERS for handler, _ in routes):
+            responses = await asyncio.gather(*(self._arun_route(handler, args) for handler, args in routes))
+            return "\n".join(responses)
+        
+        return await self._arun_route(*routes[0])
+    
+    async def _arun_route(self, handler, args: tuple) -> str:
+        """Run a route's handler, awaiting its async counterpart or offloading it to a worker thread."""
+        async_handler = self._ASYNC_HANDLERS.get(handler.__name__)
+        if async_handler:
+            return await getattr(self, async_handler)(*args)
+        
+        return await asyncio.to_thread(handler, *args)
+    
+    def _select_routes(self, user_input: str, session: Session) -> list:
+        """Pick the handlers for a user query as (handler, args) pairs, best match first.
+        
+        Only the tool intents (keyword-detected, or job/course follow-ups) can yield more than one route.
+        """
         user_input_lower = user_input.lower()
         
-        # Check for application ID pattern (both APP-YYYY-XXXXXX and UUID formats)
-        app_id_match = re.search(r'APP-\d{4}-\d{6}', user_input, re.IGNORECASE)
-        uuid_match = re.search(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', user_input, re.IGNORECASE)
+        # Check for application ID pattern (both APP-YYYY-XXXXXX and UUID formats). Both
+        # contain a hyphen, so most chat turns skip the scans, and the UUID scan only runs
+        # when no APP ID matched.
+        if '-' in user_input:
+            app_id_match = _APP_ID_RE.search(user_input)
+            if app_id_match:
+                return [(self._handle_application_query, (session, app_id_match.group().upper()))]
+            
+            uuid_match = _UUID_RE.search(user_input)
+            if uuid_match:
+                return [(self._handle_application_query, (session, uuid_match.group().lower()))]
+        
+        # Detect every keyword-based intent (and any job titles) in a single pass over the input
+        intents = self._intent_matcher.match(user_input_lower)
         
-        if app_id_match:
-            return self._handle_application_query(app_id_match.group().upper())
-        elif uuid_match:
-            return self._handle_application_query(uuid_match.group().lower())
+        routes = []
         
         # Check for job search intent
-        job_keywords = ['find job', 'job search', 'employment', 'work opportunities', 'career opportunities', 'looking for', 'positions']
-        if any(keyword in user_input_lower for keyword in job_keywords):
-            return self._handle_job_search(user_input)
+        if 'job_search' in intents:
+            routes.append((self._handle_job_search, (session, user_input, user_input_lower, intents)))
         
-        # Check for career counseling intent (more personal/advice-oriented)
-        counseling_keywords = [
-            'career advice', 'career counseling', 'career counselor', 'what should i do',
-            'career path', 'career change', 'career direction', 'career planning',
-            'feeling stuck', 'career confusion', 'career goals', 'professional advice',
-            'career transition', 'next step in career', 'career development advice',
-            'career strategy', 'career mentor', 'career coach', 'risks of switching',
-            'should i change', 'transition while working', 'prepare for transition',
-            'at my age', 'career switch', 'changing fields', 'new career',
-            'transitioning to', 'moving from', 'advance in', 'senior role',
-            'what skills should i', 'how can i advance', 'career options',
-            'product management', 'ai field', 'data science', 'switching to'
-        ]
-        if any(keyword in user_input_lower for keyword in counseling_keywords):
-            return self._handle_career_counseling(user_input, conversation_history)
+        # Check for career counseling intent (more personal/advice-oriented). A bare career
+        # field next to a job or course request ("data science courses") is answered by the
+        # search tools alone, skipping the LLM round-trip.
+        if 'career_counseling' in intents or (
+            'career_topic' in intents and 'job_search' not in intents and 'career_guidance' not in intents
+        ):
+            routes.append((self._handle_career_counseling, (session, user_input)))
         
         # Check for career guidance intent (course/training focused)
-        career_keywords = ['course recommendation', 'training', 'skill development', 'what should i study', 'courses', 'learn', 'certification']
-        if any(keyword in user_input_lower for keyword in career_keywords):
-            return self._handle_career_guidance(user_input)
+        if 'career_guidance' in intents:
+            routes.append((self._handle_career_guidance, (session, user_input, user_input_lower, intents)))
+        
+        if routes:
+            return routes
         
         # Help and general queries
-        if any(word in user_input_lower for word in ['help', 'menu', 'options', 'what can you do']):
-            return self._show_help_menu()
+        if 'help' in intents:
+            return [(self._show_help_menu, ())]
         
         # Context-aware follow-up handling
-        if self.current_applicant_data:
+        if session.applicant_data:
+            tokens = {word.strip(string.punctuation) for word in user_input_lower.split()}
+            
             # Check for counseling-related follow-ups first (more specific)
-            if any(phrase in user_input_lower for phrase in [
-                'advice', 'counseling', 'what should', 'confused', 'stuck', 'risks', 
-                'transition', 'switch', 'change', 'prepare', 'at my age', 'how can i'
-            ]):
-                return self._handle_career_counseling_for_applicant(user_input, conversation_history)
-            elif any(phrase in user_input_lower for phrase in ['job', 'work', 'employment', 'opportunities']):
-                return self._handle_job_search_for_applicant()
-            elif any(phrase in user_input_lower for phrase in ['course', 'training', 'study', 'learn', 'certification']):
-                return self._handle_career_guidance_for_applicant()
+            if tokens & self._COUNSEL_TOKENS or any(phrase in user_input_lower for phrase in self._COUNSEL_PHRASES):
+                return [(self._handle_career_counseling_for_applicant, (session, user_input))]
+            
+            # Jobs and courses can both be asked for in one follow-up
+            if tokens & self._JOB_TOKENS:
+                routes.append((self._handle_job_search_for_applicant, (session,)))
+            if tokens & self._COURSE_TOKENS:
+                routes.append((self._handle_career_guidance_for_applicant, (session,)))
+            if routes:
+                return routes
         
         # Default response
-        return self._generate_contextual_response(user_input)
+        return [(self._generate_contextual_response, (session, user_input))]
     
-    def _handle_application_query(self, app_id: str) -> str:
+    def _handle_application_query(self, session: Session, app_id: str) -> str:
         """Handle application status queries using workflow_outputs."""
         # First try to get status from workflow_outputs
         workflow_status = self._get_workflow_status(app_id)
         
         if workflow_status:
-            # Store applicant data for context from workflow outputs
-            self._extract_applicant_data_from_workflow(app_id)
-            return workflow_status + self._add_follow_up_options()
+            formatted, status_data = workflow_status
+            # Store applicant data for context from workflow outputs, reusing the parsed status
+            session.applicant_data = self._extract_applicant_data_from_workflow(app_id, preloaded=status_data)
+            return formatted + self._add_follow_up_options()
         
-        # Fallback to database query if no workflow outputs found
-        result = self.db_tool.query_application(app_id)
+        # Fallback to database query if no workflow outputs found. The summary and the
+        # applicant's background come from the same (briefly cached) query.
+        result, applicant_data = self.db_tool.query_application_with_skills(app_id)
         
         if "No application found" in result:
-            return f"""
-❌ {result}
-
-💡 **Please check:**
-• Make sure the application ID is correct (format: APP-YYYY-XXXXXX or UUID)
-• Try these sample IDs:
-  - APP-2025-000001 (Ahmed Al Mansouri)
-  - APP-2025-000004 (Aisha Al Maktoum - Approved)
-  - dd33f590-f78f-491a-825f-d14614fc7b81 (Ahmed - Processed ✅)
-
-{self._show_help_menu()}
-"""
+            return self._NOT_FOUND_TEMPLATE.format(result=result)
         
         # Store applicant data for context
-        try:
-            skills_data = self.db_tool.extract_skills(app_id)
-            self.current_applicant_data = json.loads(skills_data)
-        except:
-            self.current_applicant_data = None
+        session.applicant_data = applicant_data
         
         return result + self._add_follow_up_options()
     
-    def _get_workflow_status(self, app_id: str) -> str:
-        """Get application status from workflow_outputs directory."""
+    def _get_workflow_status(self, app_id: str) -> Optional[Tuple[str, Optional[dict]]]:
+        """Get application status from workflow_outputs directory.
+        
+        Returns (formatted status, parsed application_status.json or None), or None when
+        no workflow outputs exist for the application.
+        """
         try:
-            # Primary: Look for application directory
-            app_dir = Path(f"./workflow_outputs/{app_id}")
-            
-            if app_dir.exists() and app_dir.is_dir():
-                # Try application_status.json first
-                status_file = app_dir / "application_status.json"
-                if status_file.exists():
-                    with open(status_file, 'r') as f:
-                        status_data = json.load(f)
-                    return self._format_workflow_status(status_data)
-                
-                # Fallback to summary.json
-                summary_file = app_dir / "summary.json"
-                if summary_file.exists():
-                    with open(summary_file, 'r') as f:
-                        summary_data = json.load(f)
-                    return self._format_summary_status(summary_data, app_id)
-                
-                # Fallback to final_judgment.json
-                judgment_file = app_dir / "final_judgment.json"
-                if judgment_file.exists():
-                    with open(judgment_file, 'r') as f:
-                        judgment_data = json.load(f)
-                    return self._format_judgment_status(judgment_data, app_id)
+            # Primary: Look for application directory, trying application_status.json first,
+            # then summary.json, then final_judgment.json. Opening directly avoids separate
+            # existence probes for the directory and each candidate file.
+            app_dir = f"./workflow_outputs/{app_id}"
+            for file_name, formatter in (
+                ("application_status.json", self._format_workflow_status),
+                ("summary.json", lambda data: self._format_summary_status(data, app_id)),
+                ("final_judgment.json", lambda data: self._format_judgment_status(data, app_id))
+            ):
+                try:
+                    formatted, data = self._format_status_file(f"{app_dir}/{file_name}", formatter)
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                return formatted, (data if file_name == "application_status.json" else None)
             
             # Secondary: Look for legacy application status file
-            legacy_status_file = Path(f"./workflow_outputs/application_status_{app_id}.json")
-            if legacy_status_file.exists():
-                with open(legacy_status_file, 'r') as f:
-                    status_data = json.load(f)
-                return self._format_workflow_status(status_data)
+            try:
+                formatted, _ = self._format_status_file(
+                    f"./workflow_outputs/application_status_{app_id}.json", self._format_workflow_status
+                )
+                return formatted, None
+            except FileNotFoundError:
+                pass
             
             # Tertiary: Look for workflow directories that contain the app_id (legacy support)
-            workflow_dir = Path("./workflow_outputs")
-            if workflow_dir.exists():
-                for item in workflow_dir.iterdir():
-                    if item.is_dir() and app_id in item.name:
-                        return self._get_status_from_workflow_dir(item, app_id)
+            workflow_dir = self._find_workflow_entry(app_id, dirs_only=True)
+            if workflow_dir:
+                return self._get_status_from_workflow_dir(Path(workflow_dir), app_id), None
             
             return None
             
@@ -554,6 +1726,39 @@ class IntelligentRouter:
             print(f"Error reading workflow status: {str(e)}")
             return None
     
+    def _find_workflow_entry(self, app_id: str, dirs_only: bool = False) -> Optional[str]:
+        """Return the path of the first ./workflow_outputs entry whose name contains app_id, or None."""
+        try:
+            mtime_ns = os.stat("./workflow_outputs").st_mtime_ns
+            if mtime_ns != self._workflow_index_mtime:
+                with os.scandir("./workflow_outputs") as entries:
+                    self._workflow_index = tuple((entry.name, entry.path, entry.is_dir()) for entry in entries)
+                self._workflow_index_mtime = mtime_ns
+                self._workflow_matches.clear()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        
+        key = (app_id, dirs_only)
+        match = self._workflow_matches.get(key, _MISSING)
+        if match is _MISSING:
+            match = next(
+                (path for name, path, is_dir in self._workflow_index if app_id in name and (is_dir or not dirs_only)),
+                None
+            )
+            self._workflow_matches.put(key, match)
+        return match
+    
+    def _format_status_file(self, path: str, formatter) -> Tuple[str, dict]:
+        """Format a workflow status file as (report, parsed data), reusing both while the file is unchanged."""
+        mtime_ns = os.stat(path).st_mtime_ns
+        key = (path, mtime_ns)
+        cached = self._status_cache.get(key)
+        if cached is None:
+            data = _load_json_cached(path, mtime_ns)
+            cached = (formatter(data), data)
+            self._status_cache.put(key, cached)
+        return cached
+    
     def _format_workflow_status(self, status_data: dict) -> str:
         """Format workflow status data into a readable response."""
         app_id = status_data.get('application_id', 'Unknown')
@@ -576,333 +1781,222 @@ class IntelligentRouter:
         # Get document analysis
         doc_analysis = status_data.get('document_analysis', {})
         
-        # Status emojis
-        status_emoji = {
-            'completed': '✅',
-            'processing': '🔄',
-            'failed': '❌',
-            'pending': '⏳'
-        }.get(processing_status, '📋')
-        
-        decision_emoji = {
-            'approved': '✅',
-            'conditionally_approved': '⚠️',
-            'pending_review': '🔍',
-            'rejected': '❌'
-        }.get(final_decision, '📋')
-        
-        # Build response
-        result = f"""
+        # Status emojis and decision label
+        status_emoji = _STATUS_EMOJI.get(processing_status, '📋')
+        decision_emoji = _DECISION_EMOJI.get(final_decision, '📋')
+        decision_label = _DECISION_LABELS.get(final_decision) or final_decision.replace('_', ' ').title()
+        
+        # Build response as a list of lines joined once at the end
+        parts = [f"""
 📋 **APPLICATION STATUS REPORT**
 {'=' * 50}
 
 🆔 **Application ID:** {app_id}
 {status_emoji} **Processing Status:** {processing_status.title()}
-{decision_emoji} **Final Decision:** {final_decision.replace('_', ' ').title()}
+{decision_emoji} **Final Decision:** {decision_label}
 📈 **Overall Score:** {overall_score:.2f}/1.0
 ⏱️ **Processing Duration:** {processing_duration}
 📄 **Documents Processed:** {documents_processed}
 🎯 **Confidence Level:** {confidence_level.title()}
 ⚠️ **Risk Level:** {risk_level.title()}
-"""
+"""]
         
         # Add support information
         if support_types:
-            result += f"\n💰 **Recommended Support:** {', '.join(support_types)}"
-            result += f"\n💵 **Estimated Amount:** {support_amount}"
+            parts.append(f"💰 **Recommended Support:** {', '.join(support_types)}")
+            parts.append(f"💵 **Estimated Amount:** {support_amount}")
         
         # Add applicant information from document analysis
-        if doc_analysis:
-            result += f"\n\n👤 **APPLICANT INFORMATION**"
-            
-            # Emirates ID info
-            if 'emirates_id' in doc_analysis:
-                emirates_data = doc_analysis['emirates_id'].get('extracted_data', {})
-                if emirates_data:
-                    result += f"\n📇 **Name:** {emirates_data.get('name', 'N/A')}"
-                    result += f"\n🏴 **Nationality:** {emirates_data.get('nationality', 'N/A')}"
-                    result += f"\n🎂 **Age:** {emirates_data.get('age', 'N/A')}"
-                    result += f"\n🏙️ **Emirate:** {emirates_data.get('emirate', 'N/A')}"
-            
-            # Employment info
-            if 'resume' in doc_analysis:
-                resume_data = doc_analysis['resume'].get('extracted_data', {})
-                if resume_data:
-                    result += f"\n💼 **Current Job:** {resume_data.get('current_employment', 'N/A')}"
-                    result += f"\n📅 **Experience:** {resume_data.get('experience_years', 'N/A')} years"
-                    result += f"\n💰 **Monthly Salary:** AED {resume_data.get('monthly_salary', 'N/A'):,}"
-                    result += f"\n📊 **Employment Status:** {resume_data.get('employment_status', 'N/A').title()}"
-            
-            # Financial info
-            if 'bank_statement' in doc_analysis:
-                bank_data = doc_analysis['bank_statement'].get('extracted_data', {})
-                if bank_data:
-                    result += f"\n🏦 **Average Balance:** AED {bank_data.get('average_balance', 0):,}"
-                    result += f"\n📈 **Financial Stability:** {bank_data.get('financial_stability', 'N/A').title()}"
+        if doc_analysis:
+            parts.append(f"\n👤 **APPLICANT INFORMATION**")
             
-            if 'credit_report' in doc_analysis:
-                credit_data = doc_analysis['credit_report'].get('extracted_data', {})
-                if credit_data:
-                    result += f"\n📊 **Credit Score:** {credit_data.get('credit_score', 'N/A')}"
-                    result += f"\n💳 **Payment History:** {credit_data.get('payment_history', 'N/A').title()}"
+            for doc_key, fields in self._DOC_FIELDS:
+                if doc_key not in doc_analysis:
+                    continue
+                extracted = doc_analysis[doc_key].get('extracted_data', {})
+                if not extracted:
+                    continue
+                for field, default, fmt in fields:
+                    value = extracted.get(field, default)
+                    parts.append(fmt(value) if callable(fmt) else fmt.format(value))
         
         # Add key findings
         if key_findings:
-            result += f"\n\n🔍 **KEY FINDINGS:**"
-            for finding in key_findings[:4]:
-                result += f"\n• {finding}"
+            parts.append(f"\n🔍 **KEY FINDINGS:**")
+            parts.extend(f"• {finding}" for finding in key_findings[:4])
         
         # Add conditions if any
         if conditions:
-            result += f"\n\n⚠️ **CONDITIONS:**"
-            for condition in conditions[:3]:
-                result += f"\n• {condition}"
+            parts.append(f"\n⚠️ **CONDITIONS:**")
+            parts.extend(f"• {condition}" for condition in conditions[:3])
         
         # Add next steps
         if next_steps:
-            result += f"\n\n📋 **NEXT STEPS:**"
-            for step in next_steps[:3]:
-                result += f"\n• {step}"
+            parts.append(f"\n📋 **NEXT STEPS:**")
+            parts.extend(f"• {step}" for step in next_steps[:3])
         
-        return result
+        return "\n".join(parts)
     
-    def _extract_applicant_data_from_workflow(self, app_id: str):
-        """Extract applicant data from workflow outputs for context."""
+    def _extract_applicant_data_from_workflow(self, app_id: str, preloaded: dict = None) -> dict:
+        """Extract applicant data from workflow outputs for context.
+        
+        preloaded is the already parsed application_status.json, which skips the file lookup.
+        """
         try:
-            # Look for application directory
-            app_dir = Path(f"./workflow_outputs/{app_id}")
+            status_data = preloaded
+            
+            if status_data is None:
+                # Look for the status file in the application directory
+                status_data = _load_json_if_exists(f"./workflow_outputs/{app_id}/application_status.json")
             
-            if app_dir.exists():
-                status_file = app_dir / "application_status.json"
-                if status_file.exists():
-                    with open(status_file, 'r') as f:
-                        status_data = json.load(f)
-                    
-                    doc_analysis = status_data.get('document_analysis', {})
-                    
-                    # Extract key information for context
-                    applicant_data = {'application_id': app_id}  # Always include application_id
-                    
-                    # From Emirates ID
-                    if 'emirates_id' in doc_analysis:
-                        emirates_data = doc_analysis['emirates_id'].get('extracted_data', {})
-                        applicant_data.update({
-                            'name': emirates_data.get('name', ''),
-                            'age': emirates_data.get('age', 0),
-                            'nationality': emirates_data.get('nationality', ''),
-                            'emirate': emirates_data.get('emirate', '')
-                        })
-                    
-                    # From Resume
-                    if 'resume' in doc_analysis:
-                        resume_data = doc_analysis['resume'].get('extracted_data', {})
-                        applicant_data.update({
-                            'current_job': resume_data.get('current_employment', ''),
-                            'experience_years': resume_data.get('experience_years', 0),
-                            'monthly_salary': resume_data.get('monthly_salary', 0),
-                            'employment_status': resume_data.get('employment_status', '')
-                        })
-                    
-                    # From Bank Statement
-                    if 'bank_statement' in doc_analysis:
-                        bank_data = doc_analysis['bank_statement'].get('extracted_data', {})
-                        applicant_data.update({
-                            'average_balance': bank_data.get('average_balance', 0),
-                            'financial_stability': bank_data.get('financial_stability', '')
-                        })
-                    
-                    self.current_applicant_data = applicant_data
-                    return
+            if status_data is not None:
+                return self._applicant_data_from_status(app_id, status_data)
             
             # Fallback - try legacy status file
-            legacy_status_file = Path(f"./workflow_outputs/application_status_{app_id}.json")
-            if legacy_status_file.exists():
-                with open(legacy_status_file, 'r') as f:
-                    status_data = json.load(f)
-                # Extract similar data from legacy format
-                doc_analysis = status_data.get('document_analysis', {})
-                applicant_data = {'application_id': app_id}
-                
-                if 'emirates_id' in doc_analysis:
-                    emirates_data = doc_analysis['emirates_id'].get('extracted_data', {})
-                    applicant_data.update({
-                        'name': emirates_data.get('name', ''),
-                        'age': emirates_data.get('age', 0)
-                    })
-                
-                if 'resume' in doc_analysis:
-                    resume_data = doc_analysis['resume'].get('extracted_data', {})
-                    applicant_data.update({
-                        'current_job': resume_data.get('current_employment', ''),
-                        'experience_years': resume_data.get('experience_years', 0)
-                    })
-                
-                self.current_applicant_data = applicant_data
-                return
+            status_data = _load_json_if_exists(f"./workflow_outputs/application_status_{app_id}.json")
+            if status_data is not None:
+                return self._applicant_data_from_status(app_id, status_data, legacy=True)
             
             # If no workflow data found, set minimal context
-            self.current_applicant_data = {'application_id': app_id}
+            return {'application_id': app_id}
             
         except Exception as e:
             print(f"Error extracting applicant data from workflow: {str(e)}")
-            self.current_applicant_data = {'application_id': app_id}
+            return {'application_id': app_id}
+    
+    def _applicant_data_from_status(self, app_id: str, status_data: dict, legacy: bool = False) -> dict:
+        """Build the applicant context from a status file's document analysis.
+        
+        Legacy status files only contribute the _LEGACY_APPLICANT_FIELDS subset.
+        """
+        doc_analysis = status_data.get('document_analysis', {})
+        applicant_data = {'application_id': app_id}  # Always include application_id
+        
+        for doc_key, fields in self._APPLICANT_DOC_FIELDS:
+            if doc_key not in doc_analysis:
+                continue
+            extracted = doc_analysis[doc_key].get('extracted_data', {})
+            for out_key, key, default in fields:
+                if legacy and out_key not in self._LEGACY_APPLICANT_FIELDS:
+                    continue
+                applicant_data[out_key] = extracted.get(key, default)
+        
+        return applicant_data
     
     def _request_application_id_for_counseling(self, user_input: str) -> str:
         """Request application ID for better career counseling."""
-        return f"""
-🧠 **CAREER COUNSELING REQUEST**
-{'=' * 50}
-
-I'd be happy to provide personalized career counseling! However, to give you the most relevant and tailored advice, I need to understand your professional background first.
-
-**Please provide your Application ID** so I can:
-✅ Access your resume and work experience
-✅ Understand your skills and expertise
-✅ Review your career progression
-✅ Provide personalized recommendations
-
-📋 **Your Question:** "{user_input}"
-
-🆔 **How to proceed:**
-Simply share your Application ID (format: APP-YYYY-XXXXXX or UUID), and I'll provide detailed career counseling based on your actual professional profile.
-
-💡 **Example Application IDs:**
-• APP-2025-000001
-• dd33f590-f78f-491a-825f-d14614fc7b81
-• 68599245-48b5-4c20-b26f-5322e101b194
-
-Once you provide your Application ID, I'll analyze your resume and give you personalized career advice! 🚀
-"""
+        return self._COUNSELING_ID_REQUEST_TEMPLATE.format(user_input=user_input)
     
-    def _get_enhanced_applicant_context(self, application_id: str) -> dict:
+    def _get_enhanced_applicant_context(self, application_id: str, applicant_data: dict = None) -> dict:
         """Get enhanced applicant context including resume data from workflow outputs."""
         try:
             # Start with basic applicant data
-            enhanced_context = dict(self.current_applicant_data) if self.current_applicant_data else {}
+            enhanced_context = dict(applicant_data) if applicant_data else {}
             
-            # Try to get resume data from workflow_state.json
-            workflow_state_file = Path(f"./workflow_outputs/{application_id}/workflow_state.json")
-            
-            if workflow_state_file.exists():
-                with open(workflow_state_file, 'r') as f:
-                    workflow_data = json.load(f)
-                
-                # Extract resume data from processed documents
-                processed_docs = workflow_data.get('processed_documents', [])
-                
-                for doc in processed_docs:
-                    if doc.get('document_type') == 'resume':
-                        structured_data = doc.get('structured_data', {})
-                        
-                        # Add personal info
-                        personal_info = structured_data.get('personal_info', {})
-                        if personal_info:
-                            enhanced_context.update({
-                                'full_name': personal_info.get('name', ''),
-                                'email': personal_info.get('email', ''),
-                                'phone': personal_info.get('phone', ''),
-                                'location': personal_info.get('address', ''),
-                                'linkedin': personal_info.get('linkedin', ''),
-                                'nationality': personal_info.get('nationality', '')
-                            })
-                        
-                        # Add employment history
-                        employment_history = structured_data.get('employment_history', [])
-                        if employment_history:
-                            enhanced_context['employment_history'] = employment_history
-                            
-                            # Get current job details
-                            current_job = employment_history[0] if employment_history else {}
-                            enhanced_context.update({
-                                'current_company': current_job.get('company', ''),
-                                'current_position': current_job.get('position', ''),
-                                'current_job_description': current_job.get('description', ''),
-                                'employment_type': current_job.get('employment_type', '')
-                            })
-                        
-                        # Add education
-                        education = structured_data.get('education', [])
-                        if education:
-                            enhanced_context['education_history'] = education
-                            
-                            # Get highest education
-                            if education:
-                                highest_ed = education[0]
-                                enhanced_context.update({
-                                    'highest_degree': highest_ed.get('degree', ''),
-                                    'institution': highest_ed.get('institution', ''),
-                                    'graduation_year': highest_ed.get('end_date', '')
-                                })
-                        
-                        # Add skills
-                        skills = structured_data.get('skills', [])
-                        if skills:
-                            enhanced_context['skills'] = skills
-                        
-                        # Add certifications
-                        certifications = structured_data.get('certifications', [])
-                        if certifications:
-                            enhanced_context['certifications'] = certifications
-                        
-                        # Add projects
-                        projects = structured_data.get('projects', [])
-                        if projects:
-                            enhanced_context['projects'] = projects
-                        
-                        # Calculate total experience
-                        if employment_history:
-                            total_months = sum(job.get('duration_months', 0) for job in employment_history)
-                            enhanced_context['total_experience_years'] = round(total_months / 12, 1)
-                        
-                        # Add raw resume text for additional context
-                        extracted_content = doc.get('extracted_content', {})
-                        resume_text = extracted_content.get('text', '')
-                        if resume_text:
-                            # Store first 2000 characters for context
-                            enhanced_context['resume_summary'] = resume_text[:2000] + "..." if len(resume_text) > 2000 else resume_text
-                        
-                        break
-                
-                # Add applicant info from workflow
-                applicant_info = workflow_data.get('applicant_info', {})
-                if applicant_info:
-                    enhanced_context.update({
-                        'application_number': applicant_info.get('application_number', ''),
-                        'requested_amount': applicant_info.get('requested_amount', 0),
-                        'application_status': applicant_info.get('application_status', '')
-                    })
+            # Add resume data from workflow_state.json
+            enhanced_context.update(self._get_workflow_context(application_id))
             
             return enhanced_context
             
         except Exception as e:
             print(f"Error getting enhanced context: {str(e)}")
             # Return basic context if enhanced data unavailable
-            return dict(self.current_applicant_data) if self.current_applicant_data else {}
+            return dict(applicant_data) if applicant_data else {}
+    
+    def _get_workflow_context(self, application_id: str) -> dict:
+        """Get the resume and application fields from workflow_state.json.
+        
+        The result is cached per (file, mtime_ns) and shared between calls, so callers must not mutate it.
+        """
+        workflow_state_file = f"./workflow_outputs/{application_id}/workflow_state.json"
+        try:
+            mtime_ns = os.stat(workflow_state_file).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            return {}
+        
+        cache_key = (workflow_state_file, mtime_ns)
+        context = self._workflow_context_cache.get(cache_key)
+        if context is not None:
+            return context
+        
+        context = {}
+        resume_doc, applicant_info = _read_workflow_state(workflow_state_file)
+        
+        # Extract resume data from processed documents
+        if resume_doc is not None:
+            structured_data = resume_doc.get('structured_data', {})
+            
+            # Add personal info
+            personal_info = structured_data.get('personal_info', {})
+            if personal_info:
+                for out_key, key in self._PERSONAL_INFO_FIELDS:
+                    context[out_key] = personal_info.get(key, '')
+            
+            # Add employment history and current job details
+            employment_history = structured_data.get('employment_history', [])
+            if employment_history:
+                context['employment_history'] = employment_history
+                current_job = employment_history[0]
+                for out_key, key in self._CURRENT_JOB_FIELDS:
+                    context[out_key] = current_job.get(key, '')
+            
+            # Add education and highest education details
+            education = structured_data.get('education', [])
+            if education:
+                context['education_history'] = education
+                highest_ed = education[0]
+                for out_key, key in self._HIGHEST_EDUCATION_FIELDS:
+                    context[out_key] = highest_ed.get(key, '')
+            
+            # Add skills, certifications and projects
+            for key in ('skills', 'certifications', 'projects'):
+                values = structured_data.get(key, [])
+                if values:
+                    context[key] = values
+            
+            # Calculate total experience
+            if employment_history:
+                total_months = sum(job.get('duration_months', 0) for job in employment_history)
+                context['total_experience_years'] = round(total_months / 12, 1)
+            
+            # Add raw resume text for additional context
+            extracted_content = resume_doc.get('extracted_content', {})
+            resume_text = extracted_content.get('text', '')
+            if resume_text:
+                # Store first 2000 characters for context
+                if len(resume_text) > self._RESUME_SUMMARY_CHARS:
+                    resume_text = f"{resume_text[:self._RESUME_SUMMARY_CHARS]}..."
+                context['resume_summary'] = resume_text
+        
+        # Add applicant info from workflow
+        if applicant_info:
+            for key, default in self._APPLICANT_INFO_FIELDS:
+                context[key] = applicant_info.get(key, default)
+        
+        self._workflow_context_cache.put(cache_key, context)
+        return context
     
     def _get_status_from_workflow_dir(self, workflow_dir: Path, app_id: str) -> str:
         """Get status from workflow directory files."""
         try:
             # Try to read summary.json first
-            summary_file = workflow_dir / "summary.json"
-            if summary_file.exists():
-                with open(summary_file, 'r') as f:
-                    summary_data = json.load(f)
+            summary_data = _load_json_if_exists(workflow_dir / "summary.json")
+            if summary_data is not None:
                 return self._format_summary_status(summary_data, app_id)
             
             # Try final_judgment.json
-            judgment_file = workflow_dir / "final_judgment.json"
-            if judgment_file.exists():
-                with open(judgment_file, 'r') as f:
-                    judgment_data = json.load(f)
+            judgment_data = _load_json_if_exists(workflow_dir / "final_judgment.json")
+            if judgment_data is not None:
                 return self._format_judgment_status(judgment_data, app_id)
             
-            # Fallback to listing available files
-            files = list(workflow_dir.glob("*.json"))
+            # Fallback to counting available files
+            with os.scandir(workflow_dir) as entries:
+                json_file_count = sum(1 for entry in entries if entry.name.endswith(".json"))
             return f"""
 📋 **APPLICATION PROCESSING FOUND**
 🆔 **Application ID:** {app_id}
 📁 **Workflow Directory:** {workflow_dir.name}
-📄 **Available Files:** {len(files)} processing files found
+📄 **Available Files:** {json_file_count} processing files found
 🔄 **Status:** Processing completed - detailed results available
 
 💡 **Note:** Detailed processing results have been generated for this application.
@@ -918,39 +2012,26 @@ Once you provide your Application ID, I'll analyze your resume and give you pers
     
     def _format_summary_status(self, summary_data: dict, app_id: str) -> str:
         """Format summary data into readable status."""
-        return f"""
-📋 **APPLICATION SUMMARY**
-🆔 **Application ID:** {app_id}
-✅ **Status:** Processing completed
-📊 **Summary:** {summary_data.get('summary', 'Processing completed successfully')}
-"""
+        return self._SUMMARY_STATUS_TEMPLATE.format(
+            app_id=app_id,
+            summary=summary_data.get('summary', 'Processing completed successfully')
+        )
     
     def _format_judgment_status(self, judgment_data: dict, app_id: str) -> str:
         """Format judgment data into readable status."""
-        decision = judgment_data.get('decision', 'Under Review')
-        confidence = judgment_data.get('confidence', 'Medium')
-        
-        return f"""
-📋 **APPLICATION JUDGMENT**
-🆔 **Application ID:** {app_id}
-⚖️ **Decision:** {decision}
-🎯 **Confidence:** {confidence}
-✅ **Status:** Final judgment completed
-"""
+        return self._JUDGMENT_STATUS_TEMPLATE.format(
+            app_id=app_id,
+            decision=judgment_data.get('decision', 'Under Review'),
+            confidence=judgment_data.get('confidence', 'Medium')
+        )
 
     def _check_document_processing_status(self, app_id: str) -> str:
         """Check document processing status for an application."""
         try:
-            import json
-            from pathlib import Path
-            
             # Look for processing status file
-            status_file = Path(f"./workflow_outputs/application_status_{app_id}.json")
+            status_data = _load_json_if_exists(f"./workflow_outputs/application_status_{app_id}.json")
             
-            if status_file.exists():
-                with open(status_file, 'r') as f:
-                    status_data = json.load(f)
-                
+            if status_data is not None:
                 processing_status = status_data.get('processing_status', 'unknown')
                 final_decision = status_data.get('final_decision', 'pending')
                 overall_score = status_data.get('overall_score', 0)
@@ -964,69 +2045,51 @@ Once you provide your Application ID, I'll analyze your resume and give you pers
                 support_types = judgment.get('recommended_support_types', [])
                 support_amount = judgment.get('estimated_support_amount', 'To be determined')
                 
-                status_emoji = {
-                    'completed': '✅',
-                    'processing': '🔄',
-                    'failed': '❌',
-                    'pending': '⏳'
-                }.get(processing_status, '📋')
-                
-                decision_emoji = {
-                    'approved': '✅',
-                    'conditionally_approved': '⚠️',
-                    'pending_review': '🔍',
-                    'rejected': '❌'
-                }.get(final_decision, '📋')
+                status_emoji = _STATUS_EMOJI.get(processing_status, '📋')
+                decision_emoji = _DECISION_EMOJI.get(final_decision, '📋')
+                decision_label = _DECISION_LABELS.get(final_decision) or final_decision.replace('_', ' ').title()
                 
-                result = f"""
+                parts = [f"""
 📊 **DOCUMENT PROCESSING STATUS**
 {status_emoji} **Processing Status:** {processing_status.title()}
-{decision_emoji} **Final Decision:** {final_decision.replace('_', ' ').title()}
+{decision_emoji} **Final Decision:** {decision_label}
 📈 **Overall Score:** {overall_score:.2f}/1.0
 ⏱️ **Processing Duration:** {processing_duration}
 📄 **Documents Processed:** {documents_processed}
 🎯 **Confidence Level:** {confidence_level.title()}
 ⚠️ **Risk Level:** {risk_level.title()}
-"""
+"""]
                 
                 if support_types:
-                    result += f"\n💰 **Recommended Support:** {', '.join(support_types)}"
-                    result += f"\n💵 **Estimated Amount:** {support_amount}"
+                    parts.append(f"\n💰 **Recommended Support:** {', '.join(support_types)}")
+                    parts.append(f"\n💵 **Estimated Amount:** {support_amount}")
                 
-                # Add key findings if available
+                # Add key findings if available (top 3)
                 key_findings = judgment.get('key_findings', [])
                 if key_findings:
-                    result += f"\n\n🔍 **Key Findings:**"
-                    for finding in key_findings[:3]:  # Show top 3 findings
-                        result += f"\n• {finding}"
+                    parts.append("\n\n🔍 **Key Findings:**")
+                    parts.extend(f"\n• {finding}" for finding in key_findings[:3])
                 
-                # Add next steps if available
+                # Add next steps if available (top 3)
                 next_steps = judgment.get('next_steps', [])
                 if next_steps:
-                    result += f"\n\n📋 **Next Steps:**"
-                    for step in next_steps[:3]:  # Show top 3 steps
-                        result += f"\n• {step}"
+                    parts.append("\n\n📋 **Next Steps:**")
+                    parts.extend(f"\n• {step}" for step in next_steps[:3])
                 
-                return result
+                return ''.join(parts)
             
             else:
                 # Check if there are any workflow outputs for this application
-                workflow_dir = Path("./workflow_outputs")
-                if workflow_dir.exists():
-                    app_workflows = list(workflow_dir.glob(f"*{app_id}*"))
-                    if app_workflows:
-                        return f"""
+                app_workflow = self._find_workflow_entry(app_id)
+                if app_workflow:
+                    return f"""
 📊 **DOCUMENT PROCESSING STATUS**
 🔄 **Status:** Processing completed - results available
-📁 **Workflow Directory:** {app_workflows[0].name}
+📁 **Workflow Directory:** {os.path.basename(app_workflow)}
 💡 **Note:** Detailed processing results have been generated
 """
                 
-                return f"""
-📊 **DOCUMENT PROCESSING STATUS**
-⏳ **Status:** No document processing found for this application
-💡 **Note:** Documents may not have been uploaded or processed yet
-"""
+                return self._NO_PROCESSING_STATUS
         
         except Exception as e:
             return f"""
@@ -1035,180 +2098,278 @@ Once you provide your Application ID, I'll analyze your resume and give you pers
 💡 **Details:** {str(e)}
 """
     
-    def _handle_job_search(self, user_input: str) -> str:
+    def _handle_job_search(self, session: Session, user_input: str, user_input_lower: Optional[str] = None, keyword_hits: set = None) -> str:
         """Handle job search requests."""
-        skills = self._extract_skills_from_input(user_input)
+        skills = self._extract_skills_from_input(user_input, user_input_lower, keyword_hits)
         
-        if not skills and self.current_applicant_data:
-            skills = self.current_applicant_data.get('current_job', 'general')
+        if not skills and session.applicant_data:
+            skills = session.applicant_data.get('current_job', 'general')
         elif not skills:
             skills = "general"
         
-        return self.job_tool._run(skills, "UAE", "")
+        return self._run_search(self.job_tool, skills, "UAE", "")
     
-    def _handle_career_guidance(self, user_input: str) -> str:
+    def _handle_career_guidance(self, session: Session, user_input: str, user_input_lower: Optional[str] = None, keyword_hits: set = None) -> str:
         """Handle career guidance requests."""
-        current_skills = self._extract_skills_from_input(user_input)
+        current_skills = self._extract_skills_from_input(user_input, user_input_lower, keyword_hits)
+        applicant_data = session.applicant_data
         
-        if not current_skills and self.current_applicant_data:
-            current_skills = f"{self.current_applicant_data.get('current_job', '')} with {self.current_applicant_data.get('education', '')} education"
+        if not current_skills and applicant_data:
+            current_skills = f"{applicant_data.get('current_job', '')} with {applicant_data.get('education', '')} education"
         elif not current_skills:
             current_skills = "general background"
         
-        return self.course_tool._run(current_skills, "", "")
+        return self._run_search(self.course_tool, current_skills, "", "")
+    
+    def _run_search(self, tool, *args) -> str:
+        """Run a job/course search tool, reusing the result of an identical recent search."""
+        cache_key = (type(tool), args)
+        result = self._search_cache.get(cache_key)
+        if result is None:
+            result = tool._run(*args)
+            self._search_cache.put(cache_key, result)
+        return result
     
-    def _handle_job_search_for_applicant(self) -> str:
+    def _handle_job_search_for_applicant(self, session: Session) -> str:
         """Handle job search for current applicant."""
-        if not self.current_applicant_data:
+        applicant_data = session.applicant_data
+        if not applicant_data:
             return "Please provide your application ID first so I can understand your background."
         
-        skills = self.current_applicant_data.get('current_job', 'general')
-        experience_level = "senior" if self.current_applicant_data.get('experience_years', 0) > 5 else "mid"
+        skills = applicant_data.get('current_job', 'general')
+        experience_level = "senior" if applicant_data.get('experience_years', 0) > 5 else "mid"
         
-        return self.job_tool._run(skills, "UAE", experience_level)
+        return self._run_search(self.job_tool, skills, "UAE", experience_level)
     
-    def _handle_career_guidance_for_applicant(self) -> str:
+    def _handle_career_guidance_for_applicant(self, session: Session) -> str:
         """Handle career guidance for current applicant."""
-        if not self.current_applicant_data:
+        applicant_data = session.applicant_data
+        if not applicant_data:
             return "Please provide your application ID first so I can understand your background."
         
-        current_skills = f"{self.current_applicant_data.get('current_job', '')} with {self.current_applicant_data.get('education', '')} education"
+        education = applicant_data.get('education', '')
+        current_skills = f"{applicant_data.get('current_job', '')} with {education} education"
         
-        return self.course_tool._run(current_skills, "", self.current_applicant_data.get('education', ''))
+        return self._run_search(self.course_tool, current_skills, "", education)
     
-    def _handle_career_counseling(self, user_input: str, conversation_history: list = None) -> str:
+    def _handle_career_counseling(self, session: Session, user_input: str) -> str:
         """Handle career counseling requests using AI counselor."""
         # Check if user has provided application context
-        if not self.current_applicant_data or not self.current_applicant_data.get('application_id'):
+        applicant_data = session.applicant_data
+        app_id = applicant_data.get('application_id') if applicant_data else None
+        if not app_id:
             return self._request_application_id_for_counseling(user_input)
         
         # Get enhanced resume data from workflow outputs
-        enhanced_context = self._get_enhanced_applicant_context(self.current_applicant_data.get('application_id'))
+        enhanced_context = self._get_enhanced_applicant_context(app_id, applicant_data)
         
         return self.counseling_tool.provide_counseling(
             user_query=user_input,
             applicant_context=enhanced_context,
-            conversation_history=conversation_history
+            conversation_history=session.history
         )
     
-    def _handle_career_counseling_for_applicant(self, user_input: str, conversation_history: list = None) -> str:
+    def _handle_career_counseling_for_applicant(self, session: Session, user_input: str) -> str:
         """Handle career counseling for current applicant."""
-        if not self.current_applicant_data or not self.current_applicant_data.get('application_id'):
+        applicant_data = session.applicant_data
+        app_id = applicant_data.get('application_id') if applicant_data else None
+        if not app_id:
             return self._request_application_id_for_counseling(user_input)
         
         # Get enhanced resume data from workflow outputs
-        enhanced_context = self._get_enhanced_applicant_context(self.current_applicant_data.get('application_id'))
+        enhanced_context = self._get_enhanced_applicant_context(app_id, applicant_data)
         
         return self.counseling_tool.provide_counseling(
             user_query=user_input,
             applicant_context=enhanced_context,
-            conversation_history=conversation_history
+            conversation_history=session.history
+        )
+    
+    async def _ahandle_career_counseling(self, session: Session, user_input: str) -> str:
+        """Handle career counseling requests, awaiting the AI counselor."""
+        applicant_data = session.applicant_data
+        app_id = applicant_data.get('application_id') if applicant_data else None
+        if not app_id:
+            return self._request_application_id_for_counseling(user_input)
+        
+        # Get enhanced resume data from workflow outputs
+        enhanced_context = await asyncio.to_thread(self._get_enhanced_applicant_context, app_id, applicant_data)
+        
+        return await self.counseling_tool.aprovide_counseling(
+            user_query=user_input,
+            applicant_context=enhanced_context,
+            conversation_history=session.history
+        )
+    
+    def _stream_career_counseling(self, session: Session, user_input: str) -> Iterator[str]:
+        """Handle career counseling requests, streaming the AI counselor's answer."""
+        applicant_data = session.applicant_data
+        app_id = applicant_data.get('application_id') if applicant_data else None
+        if not app_id:
+            yield self._request_application_id_for_counseling(user_input)
+            return
+        
+        # Get enhanced resume data from workflow outputs
+        enhanced_context = self._get_enhanced_applicant_context(app_id, applicant_data)
+        
+        yield from self.counseling_tool.stream_counseling(
+            user_query=user_input,
+            applicant_context=enhanced_context,
+            conversation_history=session.history
         )
     
-    def _extract_skills_from_input(self, user_input: str) -> str:
-        """Extract skills or job titles from user input."""
-        keywords = ['engineer', 'manager', 'consultant', 'supervisor', 'developer', 'analyst', 'coordinator', 'data scientist', 'software engineer']
+    async def _astream_career_counseling(self, session: Session, user_input: str) -> AsyncIterator[str]:
+        """Handle career counseling requests, streaming the AI counselor's answer without blocking the event loop."""
+        applicant_data = session.applicant_data
+        app_id = applicant_data.get('application_id') if applicant_data else None
+        if not app_id:
+            yield self._request_application_id_for_counseling(user_input)
+            return
+        
+        # Get enhanced resume data from workflow outputs
+        enhanced_context = await asyncio.to_thread(self._get_enhanced_applicant_context, app_id, applicant_data)
         
-        for keyword in keywords:
-            if keyword in user_input.lower():
+        async for chunk in self.counseling_tool.astream_counseling(
+            user_query=user_input,
+            applicant_context=enhanced_context,
+            conversation_history=session.history
+        ):
+            yield chunk
+    
+    def _extract_skills_from_input(self, user_input: str, user_input_lower: Optional[str] = None, keyword_hits: set = None) -> str:
+        """Extract skills or job titles from user input.
+        
+        keyword_hits are the labels already matched by the routing pass, which saves a rescan.
+        """
+        if keyword_hits is None:
+            if user_input_lower is None:
+                user_input_lower = user_input.lower()
+            keyword_hits = self._skill_matcher.match(user_input_lower)
+        
+        # Pick the highest-priority keyword that occurred; a job title wins over a career field
+        for keyword in self.SKILL_KEYWORDS + self.TOPIC_KEYWORDS:
+            if keyword in keyword_hits:
                 return keyword
         
         return ""
     
     def _add_follow_up_options(self) -> str:
         """Add follow-up options after showing application details."""
-        return """
-
-🎯 **WHAT WOULD YOU LIKE TO DO NEXT?**
-
-a) 🔍 **Job Search**: Find job opportunities based on your experience
-b) 📚 **Career Guidance**: Get course recommendations and training advice
-c) 🧠 **Career Counseling**: Get personalized career advice and planning
-d) ❓ **Other Questions**: Ask me anything else about your application
-
-Just tell me what you'd like to do! 😊
-"""
+        return self._FOLLOW_UP_OPTIONS
     
     def _show_help_menu(self) -> str:
         """Show the help menu with available options."""
-        return """
-🤖 **HOW CAN I HELP YOU?**
-
-📋 **APPLICATION QUERIES:**
-• Check your application status and details
-• View approval information and amounts
-• See your complete profile information
-
-Just provide your Application ID (e.g., "APP-2025-000001")
-
-🔍 **JOB SEARCH ASSISTANCE:**
-• Find job opportunities based on your skills
-• Get salary ranges and company information
-• Receive application tips and advice
-
-💡 **CAREER GUIDANCE:**
-• Get course recommendations for skill development
-• Find training programs and certifications
-• Receive career advancement advice
-
-🧠 **CAREER COUNSELING:**
-• Get personalized career advice from AI counselor
-• Discuss career transitions and planning
-• Receive strategic career development guidance
-
-🎯 **SAMPLE APPLICATION IDs:**
-• APP-2025-000001 (Ahmed - Family Support)
-• APP-2025-000004 (Aisha - Approved ✅)
-"""
+        return self._HELP_MENU
     
-    def _generate_contextual_response(self, user_input: str) -> str:
+    def _generate_contextual_response(self, session: Session, user_input: str) -> str:
         """Generate contextual response for general queries."""
-        if self.current_applicant_data:
-            name = self.current_applicant_data.get('name', 'there')
+        if session.applicant_data:
+            name = session.applicant_data.get('name', 'there')
             return f"Hello {name}! I understand you're asking about: '{user_input}'. How can I specifically help you with your application, job search, or career development?"
         else:
-            return f"""
-🤔 I understand you're asking about: "{user_input}"
-
-{self._show_help_menu()}
-
-💡 **Try these examples:**
-• "APP-2025-000001" - Check application status
-• "Help me find jobs" - Job search assistance
-• "I need career guidance" - Course recommendations
-"""
+            return self._GENERAL_QUERY_TEMPLATE.format(user_input=user_input)
 
 
 class LangChainChatbot:
     """LangChain-enhanced chatbot for Social Security Application System."""
     
-    def __init__(self):
-        """Initialize the LangChain chatbot with intelligent routing."""
-        self.router = IntelligentRouter()
-        self.conversation_history = []
+    __slots__ = ('router', 'session', 'session_id', '_tools', '_store', '_revision', '_applicant_raw', '_turn_lock')
+    
+    def __init__(self, router: IntelligentRouter = None, max_history: int = MAX_HISTORY_MESSAGES,
+                 session_id: Optional[str] = None):
+        """Initialize the LangChain chatbot with intelligent routing.
+        
+        Pass a shared router to serve many conversations with one set of tools. max_history
+        caps the messages kept; older turns are only folded into the counselor's rolling
+        summary when it exceeds the verbatim window plus one summary batch (14 messages).
+        With a session_id and REDIS_URL set, the conversation is kept in Redis so any
+        worker can continue it.
+        """
+        self.router = router or IntelligentRouter()
+        self.session = Session(history=deque(maxlen=max_history))
+        self.session_id = session_id
+        self._tools = None
+        self._store = _get_session_store() if session_id else False
+        # Revision and applicant JSON last synced with the store
+        self._revision = None
+        self._applicant_raw = None
+        # Async turns of one conversation run one at a time, so each turn's two
+        # messages stay adjacent in the history (see _save_turn)
+        self._turn_lock = asyncio.Lock()
+    
+    @property
+    def conversation_history(self) -> deque:
+        """Most recent messages exchanged in this conversation."""
+        return self.session.history
+    
+    def _load_session(self):
+        """Catch up with turns other workers stored for this conversation."""
+        try:
+            revision, messages, applicant_raw = self._store.load(self.session_id)
+        except Exception as e:
+            print(f"⚠️ Could not load conversation {self.session_id}: {str(e)}")
+            return
+        
+        # Rebuild in place, and only when changed, so the counselor's rolling summary keeps
+        # tracking this conversation
+        if revision != self._revision:
+            history = self.session.history
+            history.clear()
+            history.extend(json.loads(message) for message in messages)
+            self._revision = revision
+        
+        if applicant_raw is not None:
+            applicant_raw = applicant_raw.decode()
+        if applicant_raw != self._applicant_raw:
+            self.session.applicant_data = json.loads(applicant_raw) if applicant_raw else None
+            self._applicant_raw = applicant_raw
+    
+    def _save_turn(self):
+        """Store the turn just added to the history (the user message and the reply)."""
+        applicant_data = self.session.applicant_data
+        applicant_raw = json.dumps(applicant_data, default=str) if applicant_data else None
+        history = self.session.history
+        try:
+            revision = self._store.save_turn(
+                self.session_id, list(islice(history, max(len(history) - 2, 0), None)),
+                history.maxlen, applicant_raw
+            )
+        except Exception as e:
+            print(f"⚠️ Could not save conversation {self.session_id}: {str(e)}")
+            return
         
-        # Create LangChain tools for structured access
-        self.tools = self._create_langchain_tools()
+        # Another worker saving in between means this copy has missed turns
+        self._revision = revision if revision == (self._revision or 0) + 1 else None
+        self._applicant_raw = applicant_raw
+    
+    @property
+    def tools(self) -> List[Tool]:
+        """LangChain tools for structured access, created on first use."""
+        if self._tools is None:
+            self._tools = self._create_langchain_tools()
+        return self._tools
     
     def _create_langchain_tools(self) -> List[Tool]:
         """Create LangChain tools for structured access."""
+        langchain = _load_langchain()
+        tool_cls = langchain.Tool if langchain else Tool
         return [
-            Tool(
+            tool_cls(
                 name="Application_Query",
                 description="Query application status and details using application ID (format: )",
-                func=self.router._handle_application_query
+                func=self._handle_application_query
             ),
-            Tool(
+            tool_cls(
                 name="Job_Search", 
                 description="Search for job opportunities based on skills and location",
-                func=self.router._handle_job_search
+                func=self._handle_job_search
             ),
-            Tool(
+            tool_cls(
                 name="Career_Guidance",
                 description="Provide career guidance and course recommendations for skill development",
-                func=self.router._handle_career_guidance
+                func=self._handle_career_guidance
             ),
-            Tool(
+            tool_cls(
                 name="Career_Counseling",
                 description="Provide personalized career counseling and advice using AI counselor for career planning, transitions, and strategic guidance",
                 func=self._handle_career_counseling_with_history
@@ -1217,18 +2378,20 @@ class LangChainChatbot:
     
     def _create_tools(self) -> List[Tool]:
         """Create LangChain tools for the agent."""
+        langchain = _load_langchain()
+        tool_cls = langchain.Tool if langchain else Tool
         return [
-            Tool(
+            tool_cls(
                 name="Application_Query",
                 description="Use this tool when user provides an application ID (format: APP-YYYY-XXXXXX) or asks about their application status. Input should be the application ID.",
                 func=self._handle_application_query
             ),
-            Tool(
+            tool_cls(
                 name="Job_Search",
                 description="Use this tool when user asks about finding jobs, employment opportunities, or work. Input should be the job title or skills to search for.",
                 func=self._handle_job_search
             ),
-            Tool(
+            tool_cls(
                 name="Career_Guidance",
                 description="Use this tool when user asks for career advice, course recommendations, training, or skill development. Input should be their current background or skills.",
                 func=self._handle_career_guidance
@@ -1237,79 +2400,156 @@ class LangChainChatbot:
     
     def _handle_application_query(self, app_id: str) -> str:
         """Handle application queries through LangChain tool."""
-        # Extract application ID if not in correct format
-        app_id_match = re.search(r'APP-\d{4}-\d{6}', app_id, re.IGNORECASE)
-        uuid_match = re.search(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', app_id, re.IGNORECASE)
+        # Extract application ID if not in correct format (the UUID scan only runs when needed)
+        app_id_match = _APP_ID_RE.search(app_id)
         
         if app_id_match:
             app_id = app_id_match.group().upper()
-        elif uuid_match:
-            app_id = uuid_match.group().lower()
-        
-        result = self.router.db_tool.query_application(app_id)
+        else:
+            uuid_match = _UUID_RE.search(app_id)
+            if uuid_match:
+                app_id = uuid_match.group().lower()
         
-        # Store applicant data for context
-        try:
-            skills_data = self.router.db_tool.extract_skills(app_id)
-            self.router.current_applicant_data = json.loads(skills_data)
-        except:
-            self.router.current_applicant_data = None
+        # Store applicant data for context, taken from the same query as the summary
+        result, self.session.applicant_data = self.router.db_tool.query_application_with_skills(app_id)
         
         return result
     
     def _handle_job_search(self, skills: str) -> str:
         """Handle job search through LangChain tool."""
         # Use current applicant data if available
-        if not skills and self.router.current_applicant_data:
-            skills = self.router.current_applicant_data.get('current_job', 'general')
+        if not skills and self.session.applicant_data:
+            skills = self.session.applicant_data.get('current_job', 'general')
         elif not skills:
             skills = "general"
         
-        return self.router.job_tool._run(skills, "UAE", "")
+        return self.router._run_search(self.router.job_tool, skills, "UAE", "")
     
     def _handle_career_guidance(self, background: str) -> str:
         """Handle career guidance through LangChain tool."""
         # Use current applicant data if available
-        if not background and self.router.current_applicant_data:
-            background = f"{self.router.current_applicant_data.get('current_job', '')} with {self.router.current_applicant_data.get('education', '')} education"
+        if not background and self.session.applicant_data:
+            background = f"{self.session.applicant_data.get('current_job', '')} with {self.session.applicant_data.get('education', '')} education"
         elif not background:
             background = "general background"
         
-        return self.router.course_tool._run(background, "", "")
+        return self.router._run_search(self.router.course_tool, background, "", "")
     
     def _handle_career_counseling_with_history(self, user_query: str) -> str:
         """Handle career counseling with conversation history."""
-        return self.router._handle_career_counseling(user_query, self.conversation_history)
+        return self.router._handle_career_counseling(self.session, user_query)
     
     def chat(self, user_input: str) -> str:
         """Process user input using intelligent routing."""
         user_input = user_input.strip()
+        if self._store:
+            self._load_session()
         
         # Add to conversation history
         self.conversation_history.append({"role": "user", "content": user_input})
         
         try:
             # Use intelligent router to process the input
-            response = self.router.route_query(user_input, self.conversation_history)
+            response = self.router.route_query(user_input, self.session)
+        except Exception as e:
+            response = f"I apologize, but I encountered an error: {str(e)}\n\n" + self.router._show_help_menu()
+        
+        # Add to conversation history
+        self.conversation_history.append({"role": "assistant", "content": response})
+        if self._store:
+            self._save_turn()
+        
+        return response
+    
+    def chat_stream(self, user_input: str) -> Iterator[str]:
+        """Process user input like chat, yielding the response in chunks as it is generated."""
+        user_input = user_input.strip()
+        if self._store:
+            self._load_session()
+        
+        # Add to conversation history
+        self.conversation_history.append({"role": "user", "content": user_input})
+        
+        parts = []
+        try:
+            for chunk in self.router.stream_query(user_input, self.session):
+                parts.append(chunk)
+                yield chunk
+        
+        except Exception as e:
+            error_response = f"I apologize, but I encountered an error: {str(e)}\n\n" + self.router._show_help_menu()
+            parts.append(error_response)
+            yield error_response
+        
+        # Add to conversation history
+        self.conversation_history.append({"role": "assistant", "content": "".join(parts)})
+        if self._store:
+            self._save_turn()
+    
+    async def achat_stream(self, user_input: str) -> AsyncIterator[str]:
+        """Process user input like achat, yielding the response in chunks as it is generated."""
+        async with self._turn_lock:
+            user_input = user_input.strip()
+            if self._store:
+                await asyncio.to_thread(self._load_session)
+            
+            # Add to conversation history
+            self.conversation_history.append({"role": "user", "content": user_input})
+            
+            parts = []
+            try:
+                async for chunk in self.router.astream_query(user_input, self.session):
+                    parts.append(chunk)
+                    yield chunk
+            
+            except Exception as e:
+                error_response = f"I apologize, but I encountered an error: {str(e)}\n\n" + self.router._show_help_menu()
+                parts.append(error_response)
+                yield error_response
+            
+            # Add to conversation history
+            self.conversation_history.append({"role": "assistant", "content": "".join(parts)})
+            if self._store:
+                await asyncio.to_thread(self._save_turn)
+    
+    async def achat(self, user_input: str) -> str:
+        """Process user input using intelligent routing without blocking the event loop."""
+        async with self._turn_lock:
+            user_input = user_input.strip()
+            if self._store:
+                await asyncio.to_thread(self._load_session)
+            
+            # Add to conversation history
+            self.conversation_history.append({"role": "user", "content": user_input})
+            
+            try:
+                response = await self.router.aroute_query(user_input, self.session)
+            except Exception as e:
+                response = f"I apologize, but I encountered an error: {str(e)}\n\n" + self.router._show_help_menu()
             
             # Add to conversation history
             self.conversation_history.append({"role": "assistant", "content": response})
+            if self._store:
+                await asyncio.to_thread(self._save_turn)
             
             return response
-            
-        except Exception as e:
-            error_response = f"I apologize, but I encountered an error: {str(e)}\n\n" + self.router._show_help_menu()
-            self.conversation_history.append({"role": "assistant", "content": error_response})
-            return error_response
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get the current conversation history."""
-        return self.conversation_history
+        if self._store:
+            self._load_session()
+        return list(self.session.history)
     
     def reset_conversation(self):
         """Reset the conversation history and applicant data."""
-        self.conversation_history = []
-        self.router.current_applicant_data = None
+        self.session = Session(history=deque(maxlen=self.session.history.maxlen))
+        self._applicant_raw = None
+        if self._store:
+            try:
+                self._revision = self._store.clear(self.session_id)
+            except Exception as e:
+                self._revision = None
+                print(f"⚠️ Could not clear conversation {self.session_id}: {str(e)}")
     
     def get_available_tools(self) -> List[str]:
         """Get list of available LangChain tools."""
@@ -1324,58 +2564,312 @@ class LangChainChatbot:
 SimpleChatbot = LangChainChatbot
 
 
+class _StreamCoalescer:
+    """Buffer streamed chunks and write them to a stream every few ms or bytes, not per token."""
+    
+    __slots__ = ('stream', 'max_chars', 'interval', '_parts', '_size', '_last_flush')
+    
+    def __init__(self, stream, max_chars: int = 256, interval: float = 0.03):
+        self.stream = stream
+        self.max_chars = max_chars
+        self.interval = interval
+        self._parts = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+    
+    def write(self, chunk: str):
+        """Buffer a chunk, flushing once enough text or time has accumulated."""
+        self._parts.append(chunk)
+        self._size += len(chunk)
+        if self._size >= self.max_chars or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+    
+    def flush(self):
+        """Write out everything buffered so far."""
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self.stream.flush()
+            self._parts.clear()
+            self._size = 0
+        self._last_flush = time.monotonic()
+
+
 class SimpleChatInterface:
     """Simple command-line interface for the chatbot."""
     
     def __init__(self):
         """Initialize the chat interface."""
-        self.chatbot = LangChainChatbot()
+        # Replies to repeated questions, keyed by a digest of the normalized input; they
+        # expire after an hour so job and course listings are fetched fresh again
+        self._response_cache = LRUCache(512, ttl=3600)
+        self._response_cache_context = None
+    
+    @cached_property
+    def chatbot(self) -> LangChainChatbot:
+        """The underlying chatbot, built on first use so the banner shows without waiting on it."""
+        return LangChainChatbot()
+    
+    @cached_property
+    def _semantic_cache(self) -> Optional[SemanticCache]:
+        """Near-duplicate (paraphrase) reply cache, opt-in since it loads an embedding model."""
+        if os.getenv("ENABLE_SEMANTIC_CACHE", "false").lower() == "true":
+            semantic = _load_semantic_encoder()
+            if semantic:
+                return SemanticCache(*semantic)
+        return None
+    
+    def _chat(self, user_input: str, stream: bool = False) -> Iterator[str]:
+        """Yield the chatbot's reply (in chunks as generated when streaming), reusing the cached one for a repeated question."""
+        response, slot = self._lookup_reply(user_input)
+        if response is not None:
+            yield response
+            return
+        
+        respond = self.chatbot.chat_stream if stream else lambda text: (self.chatbot.chat(text),)
+        parts = []
+        for chunk in respond(user_input):
+            parts.append(chunk)
+            yield chunk
+        
+        if slot:
+            self._store_reply(slot, "".join(parts))
+    
+    async def _achat(self, user_input: str) -> str:
+        """Get the chatbot's reply without blocking the event loop, reusing the cached one for a repeated question."""
+        response, slot = await self._alookup_reply(user_input)
+        if response is None:
+            response = await self.chatbot.achat(user_input)
+            if slot:
+                self._store_reply(slot, response)
+        return response
+    
+    def _lookup_reply(self, user_input: str, semantic: bool = True) -> Tuple[Optional[str], Optional[tuple]]:
+        """Look a question up in the reply caches.
+        
+        Returns (reply, None) on a hit, already recorded in the conversation history, or
+        (None, slot) on a miss, where slot is handed to _store_reply with the fresh reply
+        (None when the question must not be cached).
+        """
+        # Application lookups read live status and switch the applicant context, so never cache them
+        if _APP_ID_RE.search(user_input) or _UUID_RE.search(user_input):
+            return None, None
+        
+        # Replies depend on the loaded applicant, so drop them when the context changes
+        applicant_data = self.chatbot.session.applicant_data
+        if applicant_data is not self._response_cache_context:
+            self._clear_response_caches()
+            self._response_cache_context = applicant_data
+        
+        user_input = user_input.strip()
+        key = hashlib.blake2b(user_input.lower().encode(), digest_size=16).digest()
+        response = self._response_cache.get(key)
+        if response is not None:
+            return self._reuse_reply(user_input, response), None
+        labels = query = None
+        
+        # Fall back to a paraphrase of an earlier question with the same intents and job titles
+        if semantic and self._semantic_cache is not None:
+            labels = self.chatbot.router._intent_matcher.match(user_input.lower())
+            query = self._semantic_cache.encode(user_input)
+            response = self._semantic_cache.match(query, labels)
+            if response is not None:
+                return self._reuse_paraphrase_reply(user_input, key, response), None
+        
+        return None, (applicant_data, key, labels, query)
+    
+    async def _alookup_reply(self, user_input: str) -> Tuple[Optional[str], Optional[tuple]]:
+        """Look a question up like _lookup_reply, embedding it in a batch with concurrent questions."""
+        response, slot = self._lookup_reply(user_input, semantic=False)
+        if slot is None or self._semantic_cache is None:
+            return response, slot
+        
+        applicant_data, key, _, _ = slot
+        user_input = user_input.strip()
+        labels = self.chatbot.router._intent_matcher.match(user_input.lower())
+        query = await self._semantic_cache.aencode(user_input)
+        response = self._semantic_cache.match(query, labels)
+        
+        if response is not None:
+            return self._reuse_paraphrase_reply(user_input, key, response), None
+        
+        return None, (applicant_data, key, labels, query)
+    
+    def _reuse_reply(self, user_input: str, response: str) -> str:
+        """Serve a cached reply, keeping the conversation history as if the chatbot had answered."""
+        self.chatbot.conversation_history.append({"role": "user", "content": user_input})
+        self.chatbot.conversation_history.append({"role": "assistant", "content": response})
+        return response
+    
+    def _reuse_paraphrase_reply(self, user_input: str, key: bytes, response: str) -> str:
+        """Serve a reply matched by the semantic cache, caching it for the exact question too."""
+        self._response_cache.put(key, response)
+        return self._reuse_reply(user_input, response)
+    
+    def _store_reply(self, slot: tuple, response: str):
+        """Cache a fresh reply under the slot returned by _lookup_reply."""
+        applicant_data, key, labels, query = slot
+        # A concurrent query may have switched the applicant while this reply was generated
+        if applicant_data is not self.chatbot.session.applicant_data:
+            return
+        self._response_cache.put(key, response)
+        if query is not None and self._semantic_cache is not None:
+            self._semantic_cache.add(query, labels, response)
+    
+    def _clear_response_caches(self):
+        """Forget every cached reply."""
+        self._response_cache.clear()
+        self._response_cache_context = None
+        # Skip building the semantic cache just to clear it
+        if self.__dict__.get('_semantic_cache') is not None:
+            self._semantic_cache.clear()
+    
+    def reset_conversation(self):
+        """Reset the chatbot's conversation and applicant data along with the cached replies."""
+        self.chatbot.reset_conversation()
+        self._clear_response_caches()
+    
+    # Session commands handled by the interface itself rather than the chatbot
+    _QUIT_COMMANDS = frozenset({'quit', 'exit', 'bye', 'goodbye'})
+    _CLEAR_COMMANDS = frozenset({'clear'})
+    
+    def _enable_line_history(self):
+        """Turn on readline line editing and arrow-up recall of earlier questions, if available.
+        
+        Questions are recalled from memory for the current session only; they are written to
+        disk only when CHATBOT_HISTORY_FILE names a file to keep them in.
+        """
+        if not sys.stdin.isatty():
+            return
+        
+        try:
+            import readline
+        except ImportError:
+            return
+        
+        readline.set_history_length(1000)
+        history_file = os.getenv('CHATBOT_HISTORY_FILE')
+        if not history_file:
+            return
+        
+        history_file = os.path.expanduser(history_file)
+        try:
+            readline.read_history_file(history_file)
+        except OSError:
+            pass
+        atexit.register(self._save_line_history, readline, history_file)
+    
+    def _save_line_history(self, readline, history_file):
+        """Write the typed questions back to the history file."""
+        try:
+            readline.write_history_file(history_file)
+        except OSError:
+            pass
     
     def start_chat_session(self):
         """Start an interactive chat session."""
+        self._enable_line_history()
         self._print_banner()
+        tty = sys.stdout.isatty()
+        text = self._SESSION_TEXT if tty else self._PLAIN_SESSION_TEXT
+        reply_header = self._REPLY_HEADER if tty else self._PLAIN_REPLY_HEADER
         
-        print("🤖 Welcome! I'm your Social Security Application Assistant.")
-        print("Type 'help' to see what I can do, or 'quit' to exit.")
-        print("=" * 60)
+        print(text['welcome'])
         
         while True:
             try:
-                user_input = input("\n👤 You: ").strip()
+                user_input = input(text['prompt']).strip()
                 
                 if not user_input:
                     continue
                 
-                if user_input.lower() in ['quit', 'exit', 'bye', 'goodbye']:
-                    print("\n🤖 Thank you for using the Social Security Chatbot! Have a great day! 👋")
+                command = user_input.lower()
+                if command in self._QUIT_COMMANDS:
+                    print(text['goodbye'])
                     break
                 
-                if user_input.lower() == 'clear':
-                    self.chatbot.reset_conversation()
-                    print("\n🤖 Conversation cleared! How can I help you?")
+                if command in self._CLEAR_COMMANDS:
+                    self.reset_conversation()
+                    print(text['cleared'])
                     continue
                 
-                # Get response from chatbot
-                print("\n🤖 Assistant:")
-                print("-" * 50)
-                response = self.chatbot.chat(user_input)
-                print(response)
-                print("-" * 50)
+                # Get response from chatbot, framed by separators, in as few writes as possible
+                output = _StreamCoalescer(sys.stdout)
+                output.write(reply_header)
+                try:
+                    for chunk in self._chat(user_input, stream=True):
+                        output.write(chunk)
+                    output.write(self._REPLY_FOOTER)
+                finally:
+                    output.flush()
                 
-            except KeyboardInterrupt:
-                print("\n\n🤖 Goodbye! 👋")
+            except (KeyboardInterrupt, EOFError):
+                # Ctrl-C, or Ctrl-D / end of piped input (which would otherwise repeat forever)
+                print(text['interrupted'])
                 break
             except Exception as e:
-                print(f"\n🤖 I encountered an error: {str(e)}")
-                print("Please try again or type 'help' for assistance.")
+                print(text['error'].format(e))
     
     def single_query(self, query: str) -> str:
         """Process a single query and return the response."""
-        return self.chatbot.chat(query)
+        return "".join(self._chat(query))
     
-    def _print_banner(self):
-        """Print the application banner."""
-        banner = """
+    async def asingle_query(self, query: str) -> str:
+        """Process a single query without blocking the event loop.
+        
+        Concurrent calls share the chatbot, so their counseling LLM requests are coalesced
+        into micro-batches when ENABLE_LLM_BATCHING is set.
+        """
+        return await self._achat(query)
+    
+    def batch_query(self, queries: List[str], max_concurrency: int = 10) -> List[str]:
+        """Process several queries concurrently and return their responses in order.
+        
+        Each query is answered in a conversation of its own, so a query cannot follow up
+        on another (e.g. an application ID and a question about that applicant). The
+        batch runs on the module's background event loop.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.abatch_query(queries, max_concurrency), _get_background_loop()
+        ).result()
+    
+    async def abatch_query(self, queries: List[str], max_concurrency: int = 10) -> List[str]:
+        """Process several queries concurrently, at most max_concurrency in flight at once."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def answer(query: str) -> str:
+            # A fresh conversation per query; only the router's tools and caches are shared
+            async with semaphore:
+                return await LangChainChatbot(self.chatbot.router).achat(query)
+        
+        return list(await asyncio.gather(*(answer(query) for query in queries)))
+    
+    # Frame printed around each reply in the interactive session
+    _REPLY_HEADER = "\n🤖 Assistant:\n" + "-" * 50 + "\n"
+    _REPLY_FOOTER = "\n" + "-" * 50 + "\n"
+    _PLAIN_REPLY_HEADER = "\nAssistant:\n" + "-" * 50 + "\n"
+    
+    # Session messages, with emoji for terminals and plain for pipes and log files
+    _SESSION_TEXT = {
+        'welcome': "🤖 Welcome! I'm your Social Security Application Assistant.\n"
+                   "Type 'help' to see what I can do, or 'quit' to exit.\n" + "=" * 60,
+        'prompt': "\n👤 You: ",
+        'goodbye': "\n🤖 Thank you for using the Social Security Chatbot! Have a great day! 👋",
+        'cleared': "\n🤖 Conversation cleared! How can I help you?",
+        'interrupted': "\n\n🤖 Goodbye! 👋",
+        'error': "\n🤖 I encountered an error: {}\nPlease try again or type 'help' for assistance.",
+    }
+    _PLAIN_SESSION_TEXT = {
+        'welcome': "Welcome! I'm your Social Security Application Assistant.\n"
+                   "Type 'help' to see what I can do, or 'quit' to exit.\n" + "=" * 60,
+        'prompt': "\nYou: ",
+        'goodbye': "\nThank you for using the Social Security Chatbot! Have a great day!",
+        'cleared': "\nConversation cleared! How can I help you?",
+        'interrupted': "\n\nGoodbye!",
+        'error': "\nI encountered an error: {}\nPlease try again or type 'help' for assistance.",
+    }
+    
+    # Application banner, including print's trailing newline
+    _BANNER = """
 ╔══════════════════════════════════════════════════════════════╗
 ║                                                              ║
 ║    🇦🇪 UAE SOCIAL SECURITY APPLICATION CHATBOT 🤖            ║
@@ -1384,8 +2878,14 @@ class SimpleChatInterface:
 ║    Job Search, and Career Guidance                          ║
 ║                                                              ║
 ╚══════════════════════════════════════════════════════════════╝
+
 """
-        print(banner)
+    # One-line banner for when stdout is a pipe or log file rather than a terminal
+    _PLAIN_BANNER = "UAE Social Security Application Chatbot\n\n"
+    
+    def _print_banner(self):
+        """Print the application banner (plain text unless stdout is a terminal)."""
+        sys.stdout.write(self._BANNER if sys.stdout.isatty() else self._PLAIN_BANNER)
 
 
 def main():
@@ -5,11 +5,17 @@ This module provides simplified tools for querying the database without complex
 """
 
 import os
+import re
+import threading
+import weakref
 import psycopg2
 import psycopg2.extras
-from typing import Dict, Any, Optional, List
+from psycopg2.pool import ThreadedConnectionPool
+from cache_utils import LRUCache
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple
 import json
-from datetime import datetime
+from datetime import date
 
 
 class DatabaseConfig:
@@ -21,154 +27,306 @@ class DatabaseConfig:
         self.database = os.getenv('DB_NAME', 'social_security_system')
         self.user = os.getenv('DB_USER', 'srinadh.nidadana-c')
         self.password = os.getenv('DB_PASSWORD', '')
+        self.min_connections = int(os.getenv('DB_MIN_CONNECTIONS', '1'))
+        self.max_connections = int(os.getenv('DB_MAX_CONNECTIONS', '20'))
+
+
+# Hot lookups, prepared once per pooled connection so Postgres parses and plans them
+# only once. {predicate} is filled in per ID kind (see _LOOKUP_PREDICATES).
+_APPLICATION_QUERY = """
+    SELECT 
+        a.id as application_id,
+        a.application_number,
+        a.application_type,
+        a.priority_level,
+        a.requested_amount,
+        a.approved_amount,
+        a.support_duration,
+        a.approved_duration,
+        a.reason_for_application,
+        a.additional_notes,
+        a.application_status,
+        a.ai_assessment_score,
+        a.ai_assessment_status,
+        a.human_review_required,
+        a.submitted_at,
+        a.updated_at,
+        
+        -- Applicant details
+        ap.emirates_id,
+        ap.first_name,
+        ap.last_name,
+        ap.date_of_birth,
+        ap.gender,
+        ap.nationality,
+        ap.phone_number,
+        ap.email,
+        ap.education_level,
+        
+        -- Address
+        addr.emirate,
+        addr.city,
+        addr.area,
+        addr.address_line,
+        
+        -- Employment
+        emp.employment_status,
+        emp.employer_name,
+        emp.job_title,
+        emp.monthly_income,
+        emp.years_of_experience,
+        
+        -- Financial info
+        fin.total_household_income,
+        fin.monthly_expenses,
+        fin.existing_debts,
+        fin.savings_amount,
+        fin.property_value,
+        fin.other_assets,
+        
+        -- Banking info
+        bank.bank_name,
+        bank.account_number,
+        bank.has_bank_loan,
+        
+        -- Related records, fetched in the same round-trip
+        (SELECT json_agg(json_build_object(
+            'name', fm.name, 'relationship', fm.relationship, 'age', fm.age,
+            'has_income', fm.has_income, 'monthly_income', fm.monthly_income,
+            'is_dependent', fm.is_dependent))
+         FROM family_members fm
+         WHERE fm.applicant_id = a.applicant_id) AS family_members,
+        
+        (SELECT json_agg(json_build_object(
+            'assessment_type', ar.assessment_type, 'assessment_score', ar.assessment_score,
+            'assessment_details', ar.assessment_details, 'recommendations', ar.recommendations,
+            'risk_factors', ar.risk_factors))
+         FROM assessment_results ar
+         WHERE ar.application_id = a.id) AS assessments,
+        
+        (SELECT json_agg(json_build_object(
+            'old_status', sh.old_status, 'new_status', sh.new_status, 'changed_by', sh.changed_by,
+            'change_reason', sh.change_reason, 'created_at', sh.created_at)
+            ORDER BY sh.created_at DESC)
+         FROM (SELECT * FROM application_status_history
+               WHERE application_id = a.id
+               ORDER BY created_at DESC
+               LIMIT 5) sh) AS status_history,
+        
+        (SELECT json_agg(json_build_object(
+            'document_type', d.document_type, 'document_purpose', d.document_purpose,
+            'processing_status', d.processing_status, 'confidence_score', d.confidence_score,
+            'upload_date', d.upload_date))
+         FROM documents d
+         WHERE d.application_id = a.id) AS documents
+        
+    FROM applications a
+    JOIN applicants ap ON a.applicant_id = ap.id
+    LEFT JOIN addresses addr ON ap.id = addr.applicant_id
+    LEFT JOIN employment_info emp ON ap.id = emp.applicant_id
+    LEFT JOIN financial_info fin ON a.id = fin.application_id
+    LEFT JOIN banking_info bank ON a.id = bank.application_id
+    WHERE {predicate}
+    LIMIT 1
+"""
+
+_SKILLS_QUERY = """
+    SELECT 
+        ap.first_name,
+        ap.last_name,
+        ap.education_level,
+        emp.employment_status,
+        emp.employer_name,
+        emp.job_title,
+        emp.years_of_experience,
+        emp.monthly_income,
+        a.application_type,
+        a.reason_for_application
+    FROM applications a
+    JOIN applicants ap ON a.applicant_id = ap.id
+    LEFT JOIN employment_info emp ON ap.id = emp.applicant_id
+    WHERE {predicate}
+    LIMIT 1
+"""
+
+# Lookup by application number or by UUID, each a plain indexed comparison ($1 is text;
+# casting the id column instead would rule out its primary key index)
+_LOOKUP_PREDICATES = (
+    ('number', 'a.application_number = $1'),
+    ('id', 'a.id = $1::uuid')
+)
+
+_PREPARED_STATEMENTS = tuple(
+    (f"{name}_by_{kind}", query.format(predicate=predicate))
+    for name, query in (('app_main', _APPLICATION_QUERY), ('app_skills', _SKILLS_QUERY))
+    for kind, predicate in _LOOKUP_PREDICATES
+)
+
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+
+
+def _lookup_statement(name: str, application_id: str) -> str:
+    """Name of the prepared statement that looks application_id up by its kind."""
+    return f"{name}_by_id" if _UUID_RE.fullmatch(application_id) else f"{name}_by_number"
+
+
+# Pooled connections on which the statements above have been prepared. Weak, so
+# connections the pool closes and drops are not kept alive here.
+_PREPARED_CONNECTIONS = weakref.WeakSet()
+
+
+class _BoundedConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool whose getconn waits for a free connection.
+    
+    The plain pool raises PoolError once maxconn connections are checked out, which
+    asyncio.to_thread's worker threads easily exceed under load.
+    """
+    
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+    
+    def getconn(self, key=None):
+        self._slots.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+# Process-wide connection pool shared by every query tool, created on first use.
+# Threaded, since async callers run queries in worker threads.
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool(db_config: DatabaseConfig) -> ThreadedConnectionPool:
+    """Return the shared connection pool, creating it on first use."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = _BoundedConnectionPool(
+                    db_config.min_connections,
+                    db_config.max_connections,
+                    host=db_config.host,
+                    port=db_config.port,
+                    database=db_config.database,
+                    user=db_config.user,
+                    password=db_config.password
+                )
+    return _POOL
+
+
+# Rule under the summary title
+_SUMMARY_RULE = '=' * 50
 
 
 class SimpleApplicationQuery:
     """Simple application query tool."""
     
+    # Summaries are reused for follow-up lookups of the same application, only briefly
+    # while it is still being worked on since its status can change mid-conversation
+    SUMMARY_CACHE_SIZE = 256
+    SUMMARY_TTL = 60
+    ACTIVE_SUMMARY_TTL = 10
+    ACTIVE_STATUSES = frozenset({'submitted', 'under_review', 'documents_pending', 'processing', 'on_hold', 'draft'})
+    
     def __init__(self):
         self.db_config = DatabaseConfig()
+        # application ID -> (summary, skills dict)
+        self._summary_cache = LRUCache(self.SUMMARY_CACHE_SIZE)
     
+    @contextmanager
     def get_connection(self):
-        """Get database connection."""
-        return psycopg2.connect(
-            host=self.db_config.host,
-            port=self.db_config.port,
-            database=self.db_config.database,
-            user=self.db_config.user,
-            password=self.db_config.password
-        )
+        """Get database connection from the shared pool.
+        
+        The transaction is committed on success and rolled back on error, and the
+        connection goes back to the pool (broken connections are discarded).
+        """
+        pool = _get_pool(self.db_config)
+        connection = pool.getconn()
+        try:
+            if connection not in _PREPARED_CONNECTIONS:
+                with connection.cursor() as cursor:
+                    # Drop leftovers of an earlier attempt that failed halfway
+                    cursor.execute("DEALLOCATE ALL")
+                    for name, query in _PREPARED_STATEMENTS:
+                        cursor.execute(f"PREPARE {name}(text) AS {query}")
+                _PREPARED_CONNECTIONS.add(connection)
+            
+            yield connection
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+        finally:
+            pool.putconn(connection, close=bool(connection.closed))
+            # putconn also closes connections beyond the pool's idle minimum
+            if connection.closed:
+                _PREPARED_CONNECTIONS.discard(connection)
     
     def query_application(self, application_id: str) -> str:
         """Query application information."""
+        return self.query_application_with_skills(application_id)[0]
+    
+    def query_application_with_skills(self, application_id: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Query application information along with the applicant's skills and background.
+        
+        Both come from the same row, so callers that need the two save a second query.
+        The skills dict is None when the application is not found or the query fails.
+        Found applications are cached briefly (see SUMMARY_TTL).
+        """
+        cached = self._summary_cache.get(application_id)
+        if cached is not None:
+            return cached
+        
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                    # Main application query with applicant details
-                    main_query = """
-                    SELECT 
-                        a.id as application_id,
-                        a.application_number,
-                        a.application_type,
-                        a.priority_level,
-                        a.requested_amount,
-                        a.approved_amount,
-                        a.support_duration,
-                        a.approved_duration,
-                        a.reason_for_application,
-                        a.additional_notes,
-                        a.application_status,
-                        a.ai_assessment_score,
-                        a.ai_assessment_status,
-                        a.human_review_required,
-                        a.submitted_at,
-                        a.updated_at,
-                        
-                        -- Applicant details
-                        ap.emirates_id,
-                        ap.first_name,
-                        ap.last_name,
-                        ap.date_of_birth,
-                        ap.gender,
-                        ap.nationality,
-                        ap.phone_number,
-                        ap.email,
-                        ap.education_level,
-                        
-                        -- Address
-                        addr.emirate,
-                        addr.city,
-                        addr.area,
-                        addr.address_line,
-                        
-                        -- Employment
-                        emp.employment_status,
-                        emp.employer_name,
-                        emp.job_title,
-                        emp.monthly_income,
-                        emp.years_of_experience,
-                        
-                        -- Financial info
-                        fin.total_household_income,
-                        fin.monthly_expenses,
-                        fin.existing_debts,
-                        fin.savings_amount,
-                        fin.property_value,
-                        fin.other_assets,
-                        
-                        -- Banking info
-                        bank.bank_name,
-                        bank.account_number,
-                        bank.has_bank_loan
-                        
-                    FROM applications a
-                    JOIN applicants ap ON a.applicant_id = ap.id
-                    LEFT JOIN addresses addr ON ap.id = addr.applicant_id
-                    LEFT JOIN employment_info emp ON ap.id = emp.applicant_id
-                    LEFT JOIN financial_info fin ON a.id = fin.application_id
-                    LEFT JOIN banking_info bank ON a.id = bank.application_id
-                    WHERE a.application_number = %s OR a.id::text = %s
-                    """
-                    
-                    cursor.execute(main_query, (application_id, application_id))
+                    # Main application query with applicant details and related records
+                    cursor.execute(f"EXECUTE {_lookup_statement('app_main', application_id)}(%s)", (application_id,))
                     main_result = cursor.fetchone()
                     
                     if not main_result:
-                        return f"No application found with ID: {application_id}"
-                    
-                    # Get family members
-                    family_query = """
-                    SELECT name, relationship, age, has_income, monthly_income, is_dependent
-                    FROM family_members 
-                    WHERE applicant_id = %s
-                    """
-                    cursor.execute(family_query, (main_result['application_id'],))
-                    family_members = cursor.fetchall()
-                    
-                    # Get assessment results
-                    assessment_query = """
-                    SELECT assessment_type, assessment_score, assessment_details, 
-                           recommendations, risk_factors
-                    FROM assessment_results 
-                    WHERE application_id = %s
-                    """
-                    cursor.execute(assessment_query, (main_result['application_id'],))
-                    assessments = cursor.fetchall()
+                        return f"No application found with ID: {application_id}", None
                     
-                    # Get status history
-                    status_query = """
-                    SELECT old_status, new_status, changed_by, change_reason, created_at
-                    FROM application_status_history 
-                    WHERE application_id = %s
-                    ORDER BY created_at DESC
-                    LIMIT 5
-                    """
-                    cursor.execute(status_query, (main_result['application_id'],))
-                    status_history = cursor.fetchall()
+                    # Family members, assessments, the last 5 status changes and documents
+                    # arrive as JSON arrays (NULL when empty)
+                    family_members = main_result.pop('family_members') or []
+                    assessments = main_result.pop('assessments') or []
+                    status_history = main_result.pop('status_history') or []
+                    documents = main_result.pop('documents') or []
                     
-                    # Get documents
-                    docs_query = """
-                    SELECT document_type, document_purpose, processing_status, 
-                           confidence_score, upload_date
-                    FROM documents 
-                    WHERE application_id = %s
-                    """
-                    cursor.execute(docs_query, (main_result['application_id'],))
-                    documents = cursor.fetchall()
+                    # JSON carries timestamps as ISO strings; the summary only shows the date
+                    for status in status_history:
+                        status['created_at'] = date.fromisoformat(status['created_at'][:10])
                     
                     # Format the response
                     result = {
-                        "application_info": dict(main_result),
-                        "family_members": [dict(fm) for fm in family_members],
-                        "assessments": [dict(a) for a in assessments],
-                        "status_history": [dict(sh) for sh in status_history],
-                        "documents": [dict(d) for d in documents]
+                        "application_info": main_result,
+                        "family_members": family_members,
+                        "assessments": assessments,
+                        "status_history": status_history,
+                        "documents": documents
                     }
                     
-                    return self.format_application_summary(result)
+                    summary = self.format_application_summary(result), self._skills_from_row(main_result)
                     
         except Exception as e:
-            return f"Error querying database: {str(e)}"
+            return f"Error querying database: {str(e)}", None
+        
+        ttl = self.ACTIVE_SUMMARY_TTL if main_result['application_status'] in self.ACTIVE_STATUSES else self.SUMMARY_TTL
+        self._summary_cache.put(application_id, summary, ttl=ttl)
+        return summary
     
     def format_application_summary(self, data: Dict[str, Any]) -> str:
         """Format the application data into a readable summary."""
@@ -178,12 +336,11 @@ class SimpleApplicationQuery:
         birth_date = app.get('date_of_birth')
         age = ""
         if birth_date:
-            today = datetime.now().date()
-            age = f" (Age: {today.year - birth_date.year})"
+            age = f" (Age: {date.today().year - birth_date.year})"
         
         summary = f"""
 📋 APPLICATION SUMMARY
-{'='*50}
+{_SUMMARY_RULE}
 
 👤 APPLICANT INFORMATION:
 • Name: {app['first_name']} {app['last_name']}{age}
@@ -221,94 +378,90 @@ class SimpleApplicationQuery:
 • Human Review Required: {'Yes' if app['human_review_required'] else 'No'}
 """
 
+        parts = [summary]
+
         # Add approval information if approved
-        if app['application_status'] in ['approved'] and app['approved_amount']:
-            summary += f"""
+        if app['application_status'] == 'approved' and app['approved_amount']:
+            parts.append(f"""
 ✅ APPROVAL DETAILS:
 • Approved Amount: AED {app['approved_amount']:,.2f}
 • Approved Duration: {app['approved_duration']}
 • You can expect to receive your support payment soon!
-"""
+""")
 
         # Add financial information
         if app['total_household_income']:
-            summary += f"""
+            parts.append(f"""
 💰 FINANCIAL INFORMATION:
 • Total Household Income: AED {app['total_household_income']:,.2f}
 • Monthly Expenses: AED {app['monthly_expenses']:,.2f}
 • Existing Debts: AED {app['existing_debts']:,.2f}
 • Savings: AED {app['savings_amount']:,.2f}
 • Property Value: AED {app['property_value']:,.2f}
-"""
+""")
 
         # Add family information
         if data["family_members"]:
-            summary += f"\n👨‍👩‍👧‍👦 FAMILY MEMBERS:\n"
+            parts.append("\n👨‍👩‍👧‍👦 FAMILY MEMBERS:\n")
             for member in data["family_members"]:
                 income_info = f"(Income: AED {member['monthly_income']:,.2f})" if member['has_income'] else "(No income)"
                 dependent = "Dependent" if member['is_dependent'] else "Independent"
-                summary += f"• {member['name']} - {member['relationship']}, Age {member['age']} - {dependent} {income_info}\n"
+                parts.append(f"• {member['name']} - {member['relationship']}, Age {member['age']} - {dependent} {income_info}\n")
 
         # Add recent status changes
         if data["status_history"]:
-            summary += f"\n📈 RECENT STATUS CHANGES:\n"
+            parts.append("\n📈 RECENT STATUS CHANGES:\n")
             for status in data["status_history"][:3]:
-                summary += f"• {status['old_status']} → {status['new_status']} ({status['created_at'].strftime('%Y-%m-%d')})\n"
+                parts.append(f"• {status['old_status']} → {status['new_status']} ({status['created_at'].strftime('%Y-%m-%d')})\n")
 
         # Add documents status
         if data["documents"]:
-            summary += f"\n📎 DOCUMENTS STATUS:\n"
+            parts.append("\n📎 DOCUMENTS STATUS:\n")
             for doc in data["documents"]:
                 confidence = f"({doc['confidence_score']:.0%} confidence)" if doc['confidence_score'] else ""
-                summary += f"• {doc['document_type'].upper()}: {doc['processing_status']} {confidence}\n"
+                parts.append(f"• {doc['document_type'].upper()}: {doc['processing_status']} {confidence}\n")
 
-        return summary
+        # Join once rather than growing the summary section by section
+        return "".join(parts)
 
     def extract_skills(self, application_id: str) -> str:
         """Extract applicant skills and background."""
         try:
-            with self.get_connection() as conn:
-                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                    query = """
-                    SELECT 
-                        ap.first_name,
-                        ap.last_name,
-                        ap.education_level,
-                        emp.employment_status,
-                        emp.employer_name,
-                        emp.job_title,
-                        emp.years_of_experience,
-                        emp.monthly_income,
-                        a.application_type,
-                        a.reason_for_application
-                    FROM applications a
-                    JOIN applicants ap ON a.applicant_id = ap.id
-                    LEFT JOIN employment_info emp ON ap.id = emp.applicant_id
-                    WHERE a.application_number = %s OR a.id::text = %s
-                    """
-                    
-                    cursor.execute(query, (application_id, application_id))
-                    result = cursor.fetchone()
-                    
-                    if not result:
-                        return f"No application found with ID: {application_id}"
-                    
-                    # Format skills and background information
-                    skills_info = {
-                        "name": f"{result['first_name']} {result['last_name']}",
-                        "education": result['education_level'],
-                        "employment_status": result['employment_status'],
-                        "current_job": result['job_title'],
-                        "employer": result['employer_name'],
-                        "experience_years": result['years_of_experience'],
-                        "income_level": "High" if (result['monthly_income'] or 0) > 15000 else "Medium" if (result['monthly_income'] or 0) > 8000 else "Low",
-                        "application_reason": result['reason_for_application']
-                    }
-                    
-                    return json.dumps(skills_info, indent=2)
+            skills_info = self.extract_skills_dict(application_id)
+            if skills_info is None:
+                return f"No application found with ID: {application_id}"
+            
+            return json.dumps(skills_info, indent=2)
                     
         except Exception as e:
             return f"Error extracting skills: {str(e)}"
+    
+    def extract_skills_dict(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """Extract applicant skills and background as a dict (None if the application is not found)."""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(f"EXECUTE {_lookup_statement('app_skills', application_id)}(%s)", (application_id,))
+                result = cursor.fetchone()
+                
+                if not result:
+                    return None
+                
+                return self._skills_from_row(result)
+    
+    @staticmethod
+    def _skills_from_row(row) -> Dict[str, Any]:
+        """Format skills and background information from an applicant/employment row."""
+        monthly_income = row['monthly_income'] or 0
+        return {
+            "name": f"{row['first_name']} {row['last_name']}",
+            "education": row['education_level'],
+            "employment_status": row['employment_status'],
+            "current_job": row['job_title'],
+            "employer": row['employer_name'],
+            "experience_years": row['years_of_experience'],
+            "income_level": "High" if monthly_income > 15000 else "Medium" if monthly_income > 8000 else "Low",
+            "application_reason": row['reason_for_application']
+        }
 
 
 # Test the simple tools
@@ -0,0 +1,9 @@
+"""
+Shared test setup: the chatbot modules import their siblings by name, so req_agents
+goes on sys.path the same way running them as scripts would.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "req_agents"))
@@ -0,0 +1,205 @@
+"""Tests for SimpleChatInterface's reply caching and streamed output."""
+
+import asyncio
+import io
+import sys
+
+import pytest
+
+import cache_utils
+import simple_chatbot
+from simple_chatbot import IntelligentRouter, SimpleChatInterface, _StreamCoalescer
+
+
+@pytest.fixture
+def interface(monkeypatch):
+    monkeypatch.delenv("ENABLE_SEMANTIC_CACHE", raising=False)
+    calls = []
+
+    def route_query(self, user_input, session):
+        calls.append(user_input)
+        if user_input.startswith("APP-"):
+            session.applicant_data = {"name": user_input}
+        return f"reply {len(calls)} to {user_input}"
+
+    monkeypatch.setattr(IntelligentRouter, "route_query", route_query)
+    return SimpleChatInterface(), calls
+
+
+def test_repeated_questions_reuse_the_reply(interface):
+    chat, calls = interface
+
+    first = chat.single_query("find jobs")
+    assert chat.single_query("  Find Jobs ") == first
+    assert calls == ["find jobs"]
+
+    # The reused reply still shows up in the conversation
+    assert len(chat.chatbot.get_conversation_history()) == 4
+
+
+def test_cached_replies_expire_after_an_hour(interface, monkeypatch):
+    chat, calls = interface
+    now = [0.0]
+    monkeypatch.setattr(cache_utils.time, "monotonic", lambda: now[0])
+    chat.single_query("find jobs")
+
+    now[0] += 3599
+    chat.single_query("find jobs")
+    now[0] += 1
+    chat.single_query("find jobs")
+
+    assert calls == ["find jobs", "find jobs"]
+
+
+def test_replies_are_dropped_when_the_applicant_changes(interface):
+    chat, calls = interface
+    chat.single_query("find jobs")
+
+    chat.single_query("APP-2025-000001")
+    chat.single_query("find jobs")
+
+    assert calls == ["find jobs", "APP-2025-000001", "find jobs"]
+
+
+def test_application_lookups_are_never_cached(interface):
+    chat, calls = interface
+    chat.single_query("APP-2025-000001")
+    chat.single_query("APP-2025-000001")
+
+    assert calls == ["APP-2025-000001", "APP-2025-000001"]
+
+
+def test_reset_forgets_cached_replies(interface):
+    chat, calls = interface
+    chat.single_query("find jobs")
+    chat.reset_conversation()
+    chat.single_query("find jobs")
+
+    assert calls == ["find jobs", "find jobs"]
+
+
+class RecordingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return super().write(text)
+
+
+def test_stream_coalescer_batches_small_chunks(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(simple_chatbot.time, "monotonic", lambda: now[0])
+    stream = RecordingStream()
+    output = _StreamCoalescer(stream, max_chars=10, interval=0.03)
+
+    for chunk in ("ab", "cd", "ef"):
+        output.write(chunk)
+    assert stream.writes == []
+
+    # Enough text flushes at once...
+    output.write("ghijk")
+    assert stream.writes == ["abcdefghijk"]
+
+    # ...and so does enough time
+    output.write("l")
+    now[0] += 0.03
+    output.write("m")
+    output.flush()
+    assert stream.writes == ["abcdefghijk", "lm"]
+    assert stream.getvalue() == "abcdefghijklm"
+
+
+def test_batched_queries_get_their_own_conversations(monkeypatch):
+    turns = []
+
+    async def aroute_query(self, user_input, session):
+        turns.append((asyncio.get_running_loop(), session, user_input))
+        if user_input.startswith("APP-"):
+            session.applicant_data = {"name": user_input}
+        return f"reply to {user_input}"
+
+    monkeypatch.setattr(IntelligentRouter, "aroute_query", aroute_query)
+    chat = SimpleChatInterface()
+
+    assert chat.batch_query(["APP-2025-000001", "find jobs"]) == ["reply to APP-2025-000001", "reply to find jobs"]
+    assert chat.batch_query(["find jobs"]) == ["reply to find jobs"]
+
+    loops, sessions, _ = zip(*turns)
+    # One long-lived loop, so clients bound to it stay usable across batches
+    assert len(set(loops)) == 1
+    assert len({id(session) for session in sessions}) == 3
+    assert [list(session.history) for session in sessions][1] == [
+        {"role": "user", "content": "find jobs"}, {"role": "assistant", "content": "reply to find jobs"}
+    ]
+    assert sessions[1].applicant_data is None
+    assert chat.chatbot.get_conversation_history() == []
+
+
+class FakeReadline:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name,) + args)
+
+
+@pytest.fixture
+def line_history(monkeypatch):
+    readline = FakeReadline()
+    registered = []
+    monkeypatch.setitem(sys.modules, "readline", readline)
+    monkeypatch.setattr(simple_chatbot.sys.stdin, "isatty", lambda: True, raising=False)
+    monkeypatch.setattr(simple_chatbot.atexit, "register", lambda *args: registered.append(args))
+    return readline, registered
+
+
+def test_typed_questions_stay_in_memory_by_default(line_history, monkeypatch):
+    readline, registered = line_history
+    monkeypatch.delenv("CHATBOT_HISTORY_FILE", raising=False)
+    SimpleChatInterface()._enable_line_history()
+
+    assert readline.calls == [("set_history_length", 1000)]
+    assert registered == []
+
+
+def test_history_file_is_opt_in(line_history, monkeypatch, tmp_path):
+    readline, registered = line_history
+    history_file = str(tmp_path / "history")
+    monkeypatch.setenv("CHATBOT_HISTORY_FILE", history_file)
+    chat = SimpleChatInterface()
+    chat._enable_line_history()
+
+    assert ("read_history_file", history_file) in readline.calls
+    save, *args = registered[-1]
+    assert save == chat._save_line_history
+    save(*args)
+    assert readline.calls[-1] == ("write_history_file", history_file)
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.mark.parametrize("stdout_class, decorated", [(io.StringIO, False), (Terminal, True)])
+def test_session_output_is_plain_unless_stdout_is_a_terminal(interface, monkeypatch, stdout_class, decorated):
+    chat, _ = interface
+    monkeypatch.setattr(chat, "_chat", lambda user_input, stream=False: iter(["reply to ", user_input]))
+    stdout = stdout_class()
+    answers = iter(["find jobs", "clear", "quit"])
+    prompts = []
+
+    def fake_input(prompt):
+        prompts.append(prompt)
+        return next(answers)
+
+    monkeypatch.setattr(simple_chatbot.sys, "stdout", stdout)
+    monkeypatch.setattr("builtins.input", fake_input)
+    chat.start_chat_session()
+
+    shown = stdout.getvalue() + "".join(prompts)
+    assert "reply to find jobs" in shown
+    assert "Conversation cleared!" in shown and "Thank you for using" in shown
+    assert shown.isascii() is not decorated
@@ -0,0 +1,92 @@
+"""Tests for the LangChain tools exposed by LangChainChatbot."""
+
+import pytest
+
+import simple_chatbot
+from simple_chatbot import IntelligentRouter, LangChainChatbot
+
+APPLICANT = {"name": "Sara Ali", "current_job": "Data Analyst", "education": "Bachelor"}
+
+
+class FakeDBTool:
+    def __init__(self):
+        self.calls = []
+
+    def query_application_with_skills(self, app_id):
+        self.calls.append(app_id)
+        return f"SUMMARY {app_id}", dict(APPLICANT)
+
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    searches = []
+
+    def fake_run_search(self, tool, query, location, extra):
+        searches.append((tool, query))
+        return f"RESULTS {query}"
+
+    monkeypatch.setattr(IntelligentRouter, "_run_search", fake_run_search)
+    bot = LangChainChatbot()
+    bot.router._db_tool = FakeDBTool()
+    bot.router._job_tool = "jobs"
+    bot.router._course_tool = "courses"
+    return bot, searches
+
+
+@pytest.fixture
+def bot(chatbot):
+    return chatbot[0]
+
+
+def tool(bot, name):
+    return next(t for t in bot.tools if t.name == name)
+
+
+def test_tools_are_listed(bot):
+    assert bot.get_available_tools() == [
+        "Application_Query", "Job_Search", "Career_Guidance", "Career_Counseling"
+    ]
+
+
+def test_application_query_tool_stores_applicant_context(bot):
+    result = tool(bot, "Application_Query").func("status of app-2025-000001 please")
+
+    assert result == "SUMMARY APP-2025-000001"
+    assert bot.router.db_tool.calls == ["APP-2025-000001"]
+    assert bot.session.applicant_data == APPLICANT
+
+
+def test_job_search_tool(chatbot):
+    bot, searches = chatbot
+    assert tool(bot, "Job_Search").func("nurse") == "RESULTS nurse"
+
+    # Without skills, the loaded applicant's job is searched for
+    bot.session.applicant_data = dict(APPLICANT)
+    tool(bot, "Job_Search").func("")
+    assert searches[-1] == ("jobs", "Data Analyst")
+
+
+def test_career_guidance_tool(chatbot):
+    bot, searches = chatbot
+    assert tool(bot, "Career_Guidance").func("accounting") == "RESULTS accounting"
+
+    bot.session.applicant_data = dict(APPLICANT)
+    tool(bot, "Career_Guidance").func("")
+    assert searches[-1] == ("courses", "Data Analyst with Bachelor education")
+
+
+def test_career_counseling_tool(bot, monkeypatch):
+    seen = []
+    monkeypatch.setattr(
+        IntelligentRouter, "_handle_career_counseling",
+        lambda self, session, query: seen.append((session, query)) or "ADVICE"
+    )
+
+    assert tool(bot, "Career_Counseling").func("should I switch careers?") == "ADVICE"
+    assert seen == [(bot.session, "should I switch careers?")]
+
+
+def test_tools_fall_back_without_langchain(bot):
+    if simple_chatbot._load_langchain():
+        pytest.skip("LangChain is installed")
+    assert all(isinstance(t, simple_chatbot.Tool) for t in bot.tools)
@@ -0,0 +1,93 @@
+"""Tests for micro-batching concurrent counseling prompts and embeddings."""
+
+import asyncio
+
+import pytest
+
+from simple_chatbot import CounselingBatcher, EmbeddingBatcher, MicroBatcher
+
+
+class FakeLLM:
+    def __init__(self):
+        self.batches = []
+
+    async def abatch(self, items, config=None):
+        self.batches.append((list(items), config))
+        return [f"answer {item}" for item in items]
+
+
+def test_concurrent_prompts_share_one_batch():
+    llm = FakeLLM()
+    batcher = CounselingBatcher(llm, window=0.05, max_batch_size=16, max_concurrency=3)
+
+    async def ask_all():
+        return await asyncio.gather(*(batcher.submit(f"q{i}") for i in range(5)))
+
+    assert asyncio.run(ask_all()) == [f"answer q{i}" for i in range(5)]
+    assert llm.batches == [([f"q{i}" for i in range(5)], {"max_concurrency": 3})]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    llm = FakeLLM()
+    batcher = CounselingBatcher(llm, window=0.05, max_batch_size=2)
+
+    async def ask_all():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(ask_all()) == [f"answer {i}" for i in range(5)]
+    assert [items for items, _ in llm.batches] == [[0, 1], [2, 3], [4]]
+
+
+def test_batch_failures_reach_every_caller():
+    class FailingLLM:
+        async def abatch(self, items, config=None):
+            raise RuntimeError("rate limited")
+
+    batcher = CounselingBatcher(FailingLLM(), window=0.01)
+
+    async def ask_all():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(ask_all())
+    assert [str(result) for result in results] == ["rate limited"] * 3
+
+
+def test_concurrent_questions_share_one_encoder_call():
+    class FakeEncoder:
+        def __init__(self):
+            self.calls = []
+
+        def encode(self, items, batch_size, normalize_embeddings):
+            self.calls.append((list(items), batch_size))
+            return [len(item) for item in items]
+
+    encoder = FakeEncoder()
+    batcher = EmbeddingBatcher(encoder, window=0.05)
+
+    async def ask_all():
+        return await asyncio.gather(*(batcher.submit("q" * i) for i in range(1, 4)))
+
+    assert asyncio.run(ask_all()) == [1, 2, 3]
+    assert encoder.calls == [(["q", "qq", "qqq"], 3)]
+
+
+def test_short_batch_results_fail_the_unanswered_callers():
+    class ShortLLM:
+        async def abatch(self, items, config=None):
+            return ["only one"]
+
+    batcher = CounselingBatcher(ShortLLM(), window=0.05)
+
+    async def ask_all():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), timeout=1
+        )
+
+    first, *rest = asyncio.run(ask_all())
+    assert first == "only one"
+    assert [str(error) for error in rest] == ["Batch returned only 1 of 3 results"] * 2
+
+
+def test_batchers_must_define_how_to_run_a_batch():
+    with pytest.raises(TypeError):
+        MicroBatcher()
@@ -0,0 +1,44 @@
+"""Tests for the bounded LRU cache shared by the chatbot and its tools."""
+
+import cache_utils
+from cache_utils import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert len(cache) == 2
+
+
+def test_lru_cache_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_utils.time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=60)
+    cache.put("a", 1)
+
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_lru_cache_entries_can_have_their_own_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_utils.time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=60)
+    cache.put("short", 1, ttl=10)
+    cache.put("default", 2)
+    forever = LRUCache(maxsize=4)
+    forever.put("a", 3)
+
+    now[0] += 10
+    assert (cache.get("short"), cache.get("default")) == (None, 2)
+    now[0] += 10 ** 6
+    assert forever.get("a") == 3
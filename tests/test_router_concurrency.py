@@ -0,0 +1,61 @@
+"""Tests for using one IntelligentRouter and its caches from worker threads."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import simple_chatbot
+from cache_utils import LRUCache
+from simple_chatbot import IntelligentRouter
+
+
+def test_lazy_tools_are_created_once_under_concurrency(monkeypatch):
+    created = []
+
+    class SlowTool:
+        def __init__(self):
+            created.append(self)
+            # Widen the window between the None check and the assignment
+            time.sleep(0.05)
+
+    for name in ("SimpleApplicationQuery", "JobSearchTool", "CourseRecommendationTool"):
+        monkeypatch.setattr(simple_chatbot, name, SlowTool)
+
+    router = IntelligentRouter()
+    start = threading.Barrier(8)
+
+    def first_use(attribute):
+        start.wait()
+        return getattr(router, attribute)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        tools = list(pool.map(first_use, ["db_tool", "job_tool", "course_tool", "db_tool"] * 2))
+
+    assert len(created) == 3
+    assert tools[0] is tools[3] is router.db_tool
+
+
+def test_lru_cache_is_safe_across_threads():
+    cache = LRUCache(maxsize=16, ttl=0.001)
+    errors = []
+
+    def hammer(worker):
+        try:
+            for i in range(2000):
+                key = (worker + i) % 32
+                cache.put(key, i)
+                cache.get(key)
+                cache.get(key + 1)
+                if i % 500 == 0:
+                    cache.clear()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(cache) <= 16
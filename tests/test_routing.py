@@ -0,0 +1,165 @@
+"""Tests for IntelligentRouter's intent detection and routing precedence."""
+
+import asyncio
+
+import pytest
+
+from simple_chatbot import IntelligentRouter, KeywordMatcher, Session
+
+
+HANDLERS = (
+    "_handle_application_query", "_handle_job_search", "_handle_career_counseling",
+    "_handle_career_guidance", "_show_help_menu", "_handle_career_counseling_for_applicant",
+    "_handle_job_search_for_applicant", "_handle_career_guidance_for_applicant",
+)
+
+
+def named_handler(name):
+    def handler(self, *args, **kwargs):
+        return name
+    handler.__name__ = name
+    return handler
+
+
+@pytest.fixture
+def router(monkeypatch):
+    # Every handler just names itself, so the tests see which route was taken
+    for name in HANDLERS:
+        monkeypatch.setattr(IntelligentRouter, name, named_handler(name))
+
+    async def ahandle_career_counseling(self, *args):
+        return "_handle_career_counseling"
+
+    monkeypatch.setattr(IntelligentRouter, "_ahandle_career_counseling", ahandle_career_counseling)
+    return IntelligentRouter()
+
+
+def route(router, text, applicant=None):
+    reply = router.route_query(text, Session(applicant_data=applicant))
+    return reply if reply in HANDLERS else "default"
+
+
+def test_matcher_reports_every_label_found():
+    matcher = KeywordMatcher([("a", ["job", "find job"]), ("b", ["find"]), ("c", ["course"])])
+
+    assert matcher.match("please find jobs") == {"a", "b"}
+    assert matcher.match("nothing here") == set()
+
+
+@pytest.mark.parametrize("text, handler", [
+    ("APP-2025-000001", "_handle_application_query"),
+    ("status of dd33f590-f78f-491a-825f-d14614fc7b81", "_handle_application_query"),
+    # Job search wins over the help keyword in the same sentence
+    ("help me find job openings", "_handle_job_search"),
+    ("I need career advice", "_handle_career_counseling"),
+    ("thinking about data science", "_handle_career_counseling"),
+    ("which courses should I take", "_handle_career_guidance"),
+    ("help", "_show_help_menu"),
+    ("what are my options", "_show_help_menu"),
+    # Follow-up words mean nothing until an applicant is loaded
+    ("I want to change", "default"),
+    ("what is the weather", "default"),
+])
+def test_routes_without_an_applicant(router, text, handler):
+    assert route(router, text) == handler
+
+
+@pytest.mark.parametrize("text, handler", [
+    ("I want to change", "_handle_career_counseling_for_applicant"),
+    ("I feel stuck and want work", "_handle_career_counseling_for_applicant"),
+    ("what should be my focus", "_handle_career_counseling_for_applicant"),
+    ("any work for me?", "_handle_job_search_for_applicant"),
+    ("what can I study", "_handle_career_guidance_for_applicant"),
+    # Follow-up words are matched as whole words, punctuation aside
+    ("Switching now?", "_handle_career_counseling_for_applicant"),
+    ("any jobs?", "_handle_job_search_for_applicant"),
+    ("studying again.", "_handle_career_guidance_for_applicant"),
+    ("what is the weather", "default"),
+])
+def test_follow_ups_for_a_loaded_applicant(router, text, handler):
+    assert route(router, text, applicant={"name": "Sara"}) == handler
+
+
+# The substring checks follow-ups were matched with before whole-word matching
+SUBSTRING_FOLLOW_UPS = (
+    ("_handle_career_counseling_for_applicant", (
+        "advice", "counseling", "what should", "confused", "stuck", "risks",
+        "transition", "switch", "change", "prepare", "at my age", "how can i",
+    )),
+    ("_handle_job_search_for_applicant", ("job", "work", "employment", "opportunities")),
+    ("_handle_career_guidance_for_applicant", ("course", "training", "study", "learn", "certification")),
+)
+
+
+def substring_route(text):
+    for handler, phrases in SUBSTRING_FOLLOW_UPS:
+        if any(phrase in text.lower() for phrase in phrases):
+            return handler
+    return "default"
+
+
+@pytest.mark.parametrize("text", [
+    "I changed my mind about jobs",
+    "transitions please",
+    "I switched teams last year",
+    "my role changes next month",
+    "I prepared my CV",
+    "transitioned out of sales",
+    "switches between shifts",
+    "I worked in retail",
+    "workers wanted?",
+    "it works for me",
+    "what is the weather",
+])
+def test_inflected_follow_ups_route_as_before(router, text):
+    assert route(router, text, applicant={"name": "Sara"}) == substring_route(text)
+
+
+def test_every_tool_intent_becomes_a_route(router):
+    routes = router._select_routes("career advice: find job or take courses?", Session())
+
+    assert [handler.__name__ for handler, _ in routes] == [
+        "_handle_job_search", "_handle_career_counseling", "_handle_career_guidance"
+    ]
+    # The synchronous path still answers with the best match only
+    assert route(router, "career advice: find job or take courses?") == "_handle_job_search"
+
+
+def test_async_routing_answers_every_tool_intent(router):
+    reply = asyncio.run(router.aroute_query("career advice: find job or take courses?", Session()))
+
+    assert reply.split("\n") == ["_handle_job_search", "_handle_career_counseling", "_handle_career_guidance"]
+
+
+def test_async_routing_of_a_single_intent(router):
+    session = Session(applicant_data={"name": "Sara"})
+
+    assert asyncio.run(router.aroute_query("any jobs?", session)) == "_handle_job_search_for_applicant"
+
+
+def test_job_titles_are_found_in_the_routing_pass(router):
+    text = "Find job as a Software Engineer"
+    (handler, args), = router._select_routes(text, Session())
+    hits = args[-1]
+
+    assert {"job_search", "software engineer", "engineer"} <= hits
+    # Same pick as a fresh scan, in SKILL_KEYWORDS priority order
+    assert router._extract_skills_from_input(text, text.lower(), hits) == "engineer"
+    assert router._extract_skills_from_input(text) == "engineer"
+
+
+@pytest.mark.parametrize("text, handlers, search_term", [
+    # A career field on its own still calls for the counselor...
+    ("thinking about data science", ["_handle_career_counseling"], "data science"),
+    # ...but next to a job or course request the search tools answer alone
+    ("recommend data science courses", ["_handle_career_guidance"], "data science"),
+    ("looking for product management positions", ["_handle_job_search"], "product management"),
+    ("career advice on data science courses", ["_handle_career_counseling", "_handle_career_guidance"], "data science"),
+    # A job title wins over the career field as the search term
+    ("find job as a data science analyst", ["_handle_job_search"], "analyst"),
+])
+def test_career_fields_steer_searches(router, text, handlers, search_term):
+    routes = router._select_routes(text, Session())
+
+    assert [handler.__name__ for handler, _ in routes] == handlers
+    assert router._extract_skills_from_input(text) == search_term
@@ -0,0 +1,218 @@
+"""Tests for sharing LangChainChatbot conversations through RedisSessionStore."""
+
+import asyncio
+import json
+
+import pytest
+
+import simple_chatbot
+from simple_chatbot import IntelligentRouter, LangChainChatbot, RedisSessionStore
+
+
+class FakeRedis:
+    """The handful of Redis commands the session store uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        value = self.data.get(key)
+        return str(value).encode() if isinstance(value, int) else value
+
+    def lrange(self, key, start, end):
+        return list(self.data.get(key, []))
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(value.encode() for value in values)
+        return len(self.data[key])
+
+    def ltrim(self, key, start, end):
+        self.data[key] = self.data.get(key, [])[start:]
+        return True
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def setex(self, key, seconds, value):
+        self.data[key] = value.encode()
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def execute(self):
+        self.client.round_trips += 1
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(simple_chatbot, "_SESSION_STORE", RedisSessionStore(client))
+
+    # Echo replies; "load <name>" switches the applicant like an application lookup would
+    def route_query(self, user_input, session):
+        if user_input.startswith("load "):
+            session.applicant_data = {"name": user_input[5:]}
+        return f"reply to {user_input}"
+
+    monkeypatch.setattr(IntelligentRouter, "route_query", route_query)
+    return client
+
+
+@pytest.fixture
+def router():
+    return IntelligentRouter()
+
+
+def contents(bot):
+    return [message["content"] for message in bot.conversation_history]
+
+
+def test_turns_are_stored_in_one_round_trip_each(redis_client, router):
+    bot = LangChainChatbot(router, session_id="c1")
+    bot.chat("hello")
+
+    # One read before the turn, one write after it
+    assert redis_client.round_trips == 2
+    assert redis_client.data["rev:c1"] == 1
+    assert len(redis_client.data["hist:c1"]) == 2
+
+
+def test_another_worker_continues_the_conversation(redis_client, router):
+    first = LangChainChatbot(router, session_id="c1")
+    second = LangChainChatbot(router, session_id="c1")
+
+    first.chat("load Sara")
+    second.chat("what next?")
+
+    assert contents(second) == ["load Sara", "reply to load Sara", "what next?", "reply to what next?"]
+    assert second.session.applicant_data == {"name": "Sara"}
+
+    # The first worker catches up on its next turn
+    first.chat("thanks")
+    assert contents(first)[-4:] == ["what next?", "reply to what next?", "thanks", "reply to thanks"]
+
+
+def test_history_is_not_rebuilt_when_in_sync(redis_client, router):
+    bot = LangChainChatbot(router, session_id="c1")
+    bot.chat("one")
+    history = bot.conversation_history
+    message = history[0]
+
+    bot.chat("two")
+
+    # Same deque and entries, so the counselor's rolling summary keeps tracking them
+    assert bot.conversation_history is history
+    assert history[0] is message
+    assert bot._revision == 2
+
+
+def test_applicant_data_is_reused_until_it_changes(redis_client, router):
+    bot = LangChainChatbot(router, session_id="c1")
+    bot.chat("load Sara")
+    applicant = bot.session.applicant_data
+
+    bot.chat("more")
+    assert bot.session.applicant_data is applicant
+
+    other = LangChainChatbot(router, session_id="c1")
+    other.chat("load Omar")
+    bot.chat("again")
+    assert bot.session.applicant_data == {"name": "Omar"}
+
+
+def test_history_is_trimmed_to_max_history(redis_client, router):
+    bot = LangChainChatbot(router, max_history=4, session_id="c1")
+    for turn in range(3):
+        bot.chat(f"turn {turn}")
+
+    assert len(redis_client.data["hist:c1"]) == 4
+    fresh = LangChainChatbot(router, max_history=4, session_id="c1")
+    assert [message["content"] for message in fresh.get_conversation_history()] == [
+        "turn 1", "reply to turn 1", "turn 2", "reply to turn 2"
+    ]
+
+
+def test_concurrent_save_forces_a_rebuild(redis_client, router):
+    first = LangChainChatbot(router, session_id="c1")
+    second = LangChainChatbot(router, session_id="c1")
+    first.chat("a")
+    second.chat("b")
+
+    # Both saved from revision 1: the first worker has missed a turn, so it must reload
+    first.session.history.append({"role": "user", "content": "c"})
+    first.session.history.append({"role": "assistant", "content": "reply to c"})
+    first._save_turn()
+    assert first._revision is None
+
+    first.chat("d")
+    assert contents(first) == [
+        "a", "reply to a", "b", "reply to b", "c", "reply to c", "d", "reply to d"
+    ][-first.conversation_history.maxlen:]
+
+
+def test_reset_clears_the_shared_conversation(redis_client, router):
+    bot = LangChainChatbot(router, session_id="c1")
+    bot.chat("load Sara")
+    LangChainChatbot(router, session_id="c1").reset_conversation()
+
+    assert bot.get_conversation_history() == []
+    assert bot.session.applicant_data is None
+
+
+def test_store_errors_keep_the_turn_local(redis_client, router, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(RedisSessionStore, "load", broken)
+    monkeypatch.setattr(RedisSessionStore, "save_turn", broken)
+    bot = LangChainChatbot(router, session_id="c1")
+
+    assert bot.chat("hello") == "reply to hello"
+    assert contents(bot) == ["hello", "reply to hello"]
+
+
+def test_conversations_stay_in_memory_without_a_session_id(redis_client, router):
+    bot = LangChainChatbot(router)
+    bot.chat("hello")
+
+    assert bot._store is False
+    assert redis_client.round_trips == 0
+
+
+def test_concurrent_async_turns_stay_in_order(redis_client, router, monkeypatch):
+    async def aroute_query(self, user_input, session):
+        # The first question takes longer, so unserialized turns would interleave
+        await asyncio.sleep(0.05 if user_input == "first" else 0)
+        return f"reply to {user_input}"
+
+    monkeypatch.setattr(IntelligentRouter, "aroute_query", aroute_query)
+    bot = LangChainChatbot(router, session_id="c1")
+
+    async def ask_both():
+        return await asyncio.gather(bot.achat("first"), bot.achat("second"))
+
+    assert asyncio.run(ask_both()) == ["reply to first", "reply to second"]
+    expected = ["first", "reply to first", "second", "reply to second"]
+    assert contents(bot) == expected
+    assert [json.loads(message)["content"] for message in redis_client.data["hist:c1"]] == expected
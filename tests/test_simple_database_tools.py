@@ -0,0 +1,387 @@
+"""Tests for the pooled, prepared application lookups in simple_database_tools."""
+
+import gc
+import threading
+from datetime import date, datetime
+
+import pytest
+
+import cache_utils
+import simple_database_tools
+from simple_database_tools import SimpleApplicationQuery
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.connection.executed.append((query.split("(")[0].split()[:2], params))
+
+    def fetchone(self):
+        return self.connection.rows.pop(0) if self.connection.rows else None
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.executed = []
+        self.rows = []
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+    def statements(self, verb):
+        return [words[1] for words, _ in self.executed if words[0] == verb]
+
+
+class FakePool:
+    """Hands out one connection at a time and, like psycopg2's pool, closes returned
+    connections when it already holds keep_idle idle ones."""
+
+    def __init__(self, keep_idle=1):
+        self.keep_idle = keep_idle
+        self.idle = []
+
+    def getconn(self):
+        return self.idle.pop() if self.idle else FakeConnection()
+
+    def putconn(self, connection, close=False):
+        if close or len(self.idle) >= self.keep_idle:
+            connection.close()
+        else:
+            self.idle.append(connection)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(simple_database_tools, "_get_pool", lambda config: pool)
+    monkeypatch.setattr(simple_database_tools, "_PREPARED_CONNECTIONS", type(simple_database_tools._PREPARED_CONNECTIONS)())
+    return pool
+
+
+def test_statements_are_prepared_once_per_connection(pool):
+    tool = SimpleApplicationQuery()
+    with tool.get_connection() as first:
+        pass
+    with tool.get_connection() as second:
+        pass
+
+    assert first is second
+    assert first.statements("PREPARE") == [name for name, _ in simple_database_tools._PREPARED_STATEMENTS]
+
+
+def test_connections_closed_by_the_pool_are_forgotten(pool):
+    tool = SimpleApplicationQuery()
+    with tool.get_connection() as extra:
+        with tool.get_connection() as kept:
+            pass
+    # The pool already held an idle connection when the outer one came back, so it closed it
+    assert extra.closed and not kept.closed
+
+    assert extra not in simple_database_tools._PREPARED_CONNECTIONS
+    assert list(simple_database_tools._PREPARED_CONNECTIONS) == [kept]
+
+
+def test_prepared_connections_are_not_kept_alive(pool):
+    tool = SimpleApplicationQuery()
+    with tool.get_connection():
+        pass
+    assert len(simple_database_tools._PREPARED_CONNECTIONS) == 1
+
+    pool.idle.clear()
+    gc.collect()
+    assert len(simple_database_tools._PREPARED_CONNECTIONS) == 0
+
+
+def test_pool_size_comes_from_the_documented_settings(monkeypatch):
+    monkeypatch.setenv("DB_MIN_CONNECTIONS", "3")
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "7")
+    config = simple_database_tools.DatabaseConfig()
+
+    assert (config.min_connections, config.max_connections) == (3, 7)
+
+
+def test_checkouts_wait_for_a_free_connection(monkeypatch):
+    monkeypatch.setattr(simple_database_tools.psycopg2, "connect", lambda *args, **kwargs: FakeConnection())
+    pool = simple_database_tools._BoundedConnectionPool(0, 2)
+    first, second = pool.getconn(), pool.getconn()
+
+    # A plain ThreadedConnectionPool raises PoolError for a third checkout
+    waiting = []
+    waiter = threading.Thread(target=lambda: waiting.append(pool.getconn()))
+    waiter.start()
+    waiter.join(0.1)
+    assert waiting == []
+
+    pool.putconn(first)
+    waiter.join(1)
+    assert len(waiting) == 1 and waiting[0] not in (first, second)
+
+
+@pytest.mark.parametrize("application_id, statement", [
+    ("APP-2025-000001", "app_main_by_number"),
+    ("dd33f590-f78f-491a-825f-d14614fc7b81", "app_main_by_id"),
+    ("DD33F590-F78F-491A-825F-D14614FC7B81", "app_main_by_id"),
+    # Only a whole UUID selects the id lookup
+    ("ref dd33f590-f78f-491a-825f-d14614fc7b81", "app_main_by_number"),
+])
+def test_lookup_statement_routes_by_id_kind(application_id, statement):
+    assert simple_database_tools._lookup_statement("app_main", application_id) == statement
+
+
+def test_prepared_lookups_use_indexed_predicates():
+    statements = dict(simple_database_tools._PREPARED_STATEMENTS)
+    assert "a.application_number = $1\n    LIMIT 1" in statements["app_main_by_number"]
+    assert "a.id = $1::uuid\n    LIMIT 1" in statements["app_skills_by_id"]
+    assert all("::text" not in query for query in statements.values())
+
+
+APPLICATION = {
+    "first_name": "Sara", "last_name": "Ali", "date_of_birth": None, "emirates_id": "784-1990-1234567-1",
+    "gender": "Female", "nationality": "UAE", "education_level": "Bachelor",
+    "phone_number": "+971501234567", "email": "sara@example.com",
+    "area": "Al Barsha", "city": "Dubai", "emirate": "Dubai", "address_line": "Villa 12",
+    "employment_status": "employed", "employer_name": None, "job_title": "Analyst",
+    "monthly_income": 9000.5, "years_of_experience": None,
+    "application_number": "APP-2025-000001", "application_type": "financial_support",
+    "application_status": "approved", "priority_level": "high", "requested_amount": 5000,
+    "support_duration": "6 months", "reason_for_application": "Job loss",
+    "submitted_at": datetime(2025, 1, 2, 3, 4), "ai_assessment_score": None, "ai_assessment_status": None,
+    "human_review_required": True, "approved_amount": 4000, "approved_duration": "3 months",
+    "total_household_income": 12000, "monthly_expenses": 8000, "existing_debts": 20000,
+    "savings_amount": 3000, "property_value": 0,
+}
+
+FULL_APPLICATION = {
+    "application_info": APPLICATION,
+    "family_members": [
+        {"name": "Omar", "relationship": "son", "age": 3, "has_income": False, "is_dependent": True, "monthly_income": 0},
+        {"name": "Ali", "relationship": "husband", "age": 35, "has_income": True, "is_dependent": False, "monthly_income": 3000},
+    ],
+    "assessments": [],
+    "status_history": [
+        {"old_status": "submitted", "new_status": "under_review", "created_at": date(2025, 1, day)} for day in range(3, 7)
+    ],
+    "documents": [
+        {"document_type": "resume", "processing_status": "completed", "confidence_score": 0.9},
+        {"document_type": "emirates_id", "processing_status": "pending", "confidence_score": None},
+    ],
+}
+
+MINIMAL_APPLICATION = {
+    "application_info": dict(
+        APPLICATION, application_status="submitted", approved_amount=None, total_household_income=None,
+        submitted_at=None
+    ),
+    "family_members": [], "assessments": [], "status_history": [], "documents": [],
+}
+
+FULL_SUMMARY = """
+📋 APPLICATION SUMMARY
+==================================================
+
+👤 APPLICANT INFORMATION:
+• Name: Sara Ali
+• Emirates ID: 784-1990-1234567-1
+• Gender: Female
+• Nationality: UAE
+• Education: Bachelor
+• Phone: +971501234567
+• Email: sara@example.com
+
+📍 ADDRESS:
+• Location: Al Barsha, Dubai, Dubai
+• Address: Villa 12
+
+🏢 EMPLOYMENT:
+• Status: employed
+• Employer: N/A
+• Position: Analyst
+• Monthly Income: AED 9,000.50
+• Experience: 0 years
+
+📄 APPLICATION DETAILS:
+• Application Number: APP-2025-000001
+• Type: financial_support
+• Status: APPROVED
+• Priority: high
+• Requested Amount: AED 5,000.00
+• Support Duration: 6 months
+• Reason: Job loss
+• Submitted: 2025-01-02 03:04
+
+🤖 AI ASSESSMENT:
+• Score: N/A%
+• Status: Pending
+• Human Review Required: Yes
+
+✅ APPROVAL DETAILS:
+• Approved Amount: AED 4,000.00
+• Approved Duration: 3 months
+• You can expect to receive your support payment soon!
+
+💰 FINANCIAL INFORMATION:
+• Total Household Income: AED 12,000.00
+• Monthly Expenses: AED 8,000.00
+• Existing Debts: AED 20,000.00
+• Savings: AED 3,000.00
+• Property Value: AED 0.00
+
+👨‍👩‍👧‍👦 FAMILY MEMBERS:
+• Omar - son, Age 3 - Dependent (No income)
+• Ali - husband, Age 35 - Independent (Income: AED 3,000.00)
+
+📈 RECENT STATUS CHANGES:
+• submitted → under_review (2025-01-03)
+• submitted → under_review (2025-01-04)
+• submitted → under_review (2025-01-05)
+
+📎 DOCUMENTS STATUS:
+• RESUME: completed (90% confidence)
+""" + "• EMIRATES_ID: pending \n"  # no confidence score, so the line ends in a space
+
+MINIMAL_SUMMARY = """
+📋 APPLICATION SUMMARY
+==================================================
+
+👤 APPLICANT INFORMATION:
+• Name: Sara Ali
+• Emirates ID: 784-1990-1234567-1
+• Gender: Female
+• Nationality: UAE
+• Education: Bachelor
+• Phone: +971501234567
+• Email: sara@example.com
+
+📍 ADDRESS:
+• Location: Al Barsha, Dubai, Dubai
+• Address: Villa 12
+
+🏢 EMPLOYMENT:
+• Status: employed
+• Employer: N/A
+• Position: Analyst
+• Monthly Income: AED 9,000.50
+• Experience: 0 years
+
+📄 APPLICATION DETAILS:
+• Application Number: APP-2025-000001
+• Type: financial_support
+• Status: SUBMITTED
+• Priority: high
+• Requested Amount: AED 5,000.00
+• Support Duration: 6 months
+• Reason: Job loss
+• Submitted: N/A
+
+🤖 AI ASSESSMENT:
+• Score: N/A%
+• Status: Pending
+• Human Review Required: Yes
+"""
+
+
+@pytest.mark.parametrize("data, summary", [
+    (FULL_APPLICATION, FULL_SUMMARY), (MINIMAL_APPLICATION, MINIMAL_SUMMARY)
+])
+def test_application_summary_format(data, summary):
+    assert SimpleApplicationQuery().format_application_summary(data) == summary
+
+
+def application_row(status):
+    return {
+        "application_status": status, "family_members": None, "assessments": None,
+        "status_history": None, "documents": None, "first_name": "Sara", "last_name": "Ali",
+        "education_level": "Bachelor", "employment_status": "employed", "employer_name": "ADNOC",
+        "job_title": "Analyst", "years_of_experience": 4, "monthly_income": 9000,
+        "reason_for_application": "job loss",
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_utils.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def lookup_tool(pool):
+    tool = SimpleApplicationQuery()
+    tool.format_application_summary = lambda data: f"SUMMARY {data['application_info']['application_status']}"
+    return tool
+
+
+def serve(pool, *rows):
+    """Queue rows for the next lookups and return the connection that will serve them."""
+    if not pool.idle:
+        pool.idle.append(FakeConnection())
+    connection = pool.idle[-1]
+    connection.rows.extend(rows)
+    return connection
+
+
+def test_summaries_are_cached_until_they_expire(pool, clock, lookup_tool):
+    connection = serve(pool, application_row("approved"), application_row("rejected"))
+
+    first = lookup_tool.query_application_with_skills("APP-2025-000001")
+    clock[0] += SimpleApplicationQuery.SUMMARY_TTL - 1
+    assert lookup_tool.query_application_with_skills("APP-2025-000001") is first
+    assert connection.statements("EXECUTE") == ["app_main_by_number"]
+
+    clock[0] += 1
+    assert lookup_tool.query_application_with_skills("APP-2025-000001")[0] == "SUMMARY rejected"
+    assert connection.statements("EXECUTE") == ["app_main_by_number"] * 2
+
+
+@pytest.mark.parametrize("status", ["under_review", "draft"])
+def test_active_applications_expire_sooner(pool, clock, lookup_tool, status):
+    serve(pool, application_row(status), application_row("approved"))
+
+    assert lookup_tool.query_application_with_skills("APP-2025-000002")[0] == f"SUMMARY {status}"
+    clock[0] += SimpleApplicationQuery.ACTIVE_SUMMARY_TTL - 1
+    assert lookup_tool.query_application_with_skills("APP-2025-000002")[0] == f"SUMMARY {status}"
+    clock[0] += 1
+    assert lookup_tool.query_application_with_skills("APP-2025-000002")[0] == "SUMMARY approved"
+
+
+def test_missing_applications_and_errors_are_not_cached(pool, clock, lookup_tool):
+    connection = serve(pool)
+
+    assert lookup_tool.query_application_with_skills("APP-2025-000003") == (
+        "No application found with ID: APP-2025-000003", None
+    )
+    connection.rows.append(application_row("approved"))
+    summary, skills = lookup_tool.query_application_with_skills("APP-2025-000003")
+
+    assert summary == "SUMMARY approved"
+    assert skills["current_job"] == "Analyst"
+    assert skills["income_level"] == "Medium"
+
+
+def test_summary_cache_is_bounded(pool, clock, lookup_tool):
+    lookup_tool._summary_cache.maxsize = 2
+    serve(pool, *(application_row("approved") for _ in range(3)))
+
+    for number in range(3):
+        lookup_tool.query_application_with_skills(f"APP-2025-00000{number}")
+
+    assert len(lookup_tool._summary_cache) == 2
+    assert lookup_tool._summary_cache.get("APP-2025-000000") is None
@@ -0,0 +1,193 @@
+"""Tests for reading and formatting workflow status files."""
+
+import json
+import os
+
+import pytest
+
+from simple_chatbot import IntelligentRouter, _load_json, _load_json_cached, _read_workflow_state
+
+
+def write_json(path, data, mtime_ns):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_status_files_are_reread_when_rewritten(tmp_path):
+    status_file = tmp_path / "application_status.json"
+    write_json(status_file, {"status": "processing"}, 1_000_000_000)
+    first = _load_json(status_file)
+
+    assert _load_json(status_file) is first
+
+    write_json(status_file, {"status": "approved"}, 2_000_000_000)
+    assert _load_json(status_file) == {"status": "approved"}
+
+
+def test_workflow_state_is_parsed_without_caching_the_file(tmp_path):
+    state_file = tmp_path / "workflow_state.json"
+    resume = {"document_type": "resume", "structured_data": {"skills": ["Python"]}}
+    write_json(state_file, {
+        "processed_documents": [{"document_type": "emirates_id"}, resume],
+        "applicant_info": {"name": "Sara"},
+    }, 1_000_000_000)
+    cached_files = _load_json_cached.cache_info().currsize
+
+    assert _read_workflow_state(state_file) == (resume, {"name": "Sara"})
+    assert _load_json_cached.cache_info().currsize == cached_files
+    assert _read_workflow_state(tmp_path / "missing.json") == (None, {})
+
+
+FULL_STATUS = {
+    "application_id": "APP-2025-000004",
+    "processing_status": "completed",
+    "final_decision": "conditionally_approved",
+    "overall_score": 0.8125,
+    "processing_duration": "42.3s",
+    "documents_processed": 5,
+    "judgment_summary": {
+        "confidence_level": "high",
+        "risk_level": "low",
+        "recommended_support_types": ["financial_assistance", "job_training"],
+        "estimated_support_amount": "AED 3,500/month",
+        "key_findings": ["Stable income", "Low debt", "Two dependents", "Good credit", "Extra finding"],
+        "conditions": ["Attend training"],
+        "next_steps": ["Sign agreement", "Upload payslip", "Book interview", "Extra step"],
+    },
+    "document_analysis": {
+        "emirates_id": {"extracted_data": {
+            "name": "Aisha Al Mansoori", "nationality": "UAE", "age": 34, "emirate": "Dubai"
+        }},
+        "resume": {"extracted_data": {
+            "current_employment": "Teacher", "experience_years": 8, "monthly_salary": 12000,
+            "employment_status": "employed"
+        }},
+        "bank_statement": {"extracted_data": {"average_balance": 15250, "financial_stability": "stable"}},
+        "credit_report": {"extracted_data": {"credit_score": 712, "payment_history": "good"}},
+    },
+}
+
+
+FULL_REPORT = """
+📋 **APPLICATION STATUS REPORT**
+==================================================
+
+🆔 **Application ID:** APP-2025-000004
+✅ **Processing Status:** Completed
+⚠️ **Final Decision:** Conditionally Approved
+📈 **Overall Score:** 0.81/1.0
+⏱️ **Processing Duration:** 42.3s
+📄 **Documents Processed:** 5
+🎯 **Confidence Level:** High
+⚠️ **Risk Level:** Low
+
+💰 **Recommended Support:** financial_assistance, job_training
+💵 **Estimated Amount:** AED 3,500/month
+
+👤 **APPLICANT INFORMATION**
+📇 **Name:** Aisha Al Mansoori
+🏴 **Nationality:** UAE
+🎂 **Age:** 34
+🏙️ **Emirate:** Dubai
+💼 **Current Job:** Teacher
+📅 **Experience:** 8 years
+💰 **Monthly Salary:** AED 12,000
+📊 **Employment Status:** Employed
+🏦 **Average Balance:** AED 15,250
+📈 **Financial Stability:** Stable
+📊 **Credit Score:** 712
+💳 **Payment History:** Good
+
+🔍 **KEY FINDINGS:**
+• Stable income
+• Low debt
+• Two dependents
+• Good credit
+
+⚠️ **CONDITIONS:**
+• Attend training
+
+📋 **NEXT STEPS:**
+• Sign agreement
+• Upload payslip
+• Book interview"""
+
+MINIMAL_REPORT = """
+📋 **APPLICATION STATUS REPORT**
+==================================================
+
+🆔 **Application ID:** APP-2025-000001
+📋 **Processing Status:** Unknown
+📋 **Final Decision:** Pending
+📈 **Overall Score:** 0.00/1.0
+⏱️ **Processing Duration:** N/A
+📄 **Documents Processed:** 0
+🎯 **Confidence Level:** Medium
+⚠️ **Risk Level:** Medium
+"""
+
+
+@pytest.fixture
+def router():
+    return IntelligentRouter()
+
+
+def test_full_status_report(router):
+    assert router._format_workflow_status(FULL_STATUS) == FULL_REPORT
+
+
+def test_status_report_defaults(router):
+    assert router._format_workflow_status({"application_id": "APP-2025-000001"}) == MINIMAL_REPORT
+
+
+def test_status_reports_are_reused_until_the_file_changes(router, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    status_file = tmp_path / "workflow_outputs" / "APP-2025-000004" / "application_status.json"
+    status_file.parent.mkdir(parents=True)
+    write_json(status_file, FULL_STATUS, 1_000_000_000)
+
+    report, status_data = router._get_workflow_status("APP-2025-000004")
+    assert (report, status_data) == (FULL_REPORT, FULL_STATUS)
+    assert router._get_workflow_status("APP-2025-000004")[0] is report
+
+    write_json(status_file, dict(FULL_STATUS, processing_status="failed"), 2_000_000_000)
+    assert "❌ **Processing Status:** Failed" in router._get_workflow_status("APP-2025-000004")[0]
+
+
+PROCESSING_REPORT = """
+📊 **DOCUMENT PROCESSING STATUS**
+✅ **Processing Status:** Completed
+⚠️ **Final Decision:** Conditionally Approved
+📈 **Overall Score:** 0.81/1.0
+⏱️ **Processing Duration:** 42.3s
+📄 **Documents Processed:** 5
+🎯 **Confidence Level:** High
+⚠️ **Risk Level:** Low
+
+💰 **Recommended Support:** financial_assistance, job_training
+💵 **Estimated Amount:** AED 3,500/month
+
+🔍 **Key Findings:**
+• Stable income
+• Low debt
+• Two dependents
+
+📋 **Next Steps:**
+• Sign agreement
+• Upload payslip
+• Book interview"""
+
+
+def test_document_processing_status(router, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "workflow_outputs" / "wf_APP-2025-000002_run").mkdir(parents=True)
+    write_json(tmp_path / "workflow_outputs" / "application_status_APP-2025-000004.json", FULL_STATUS, 1_000_000_000)
+
+    assert router._check_document_processing_status("APP-2025-000004") == PROCESSING_REPORT
+    assert router._check_document_processing_status("APP-2025-000002") == """
+📊 **DOCUMENT PROCESSING STATUS**
+🔄 **Status:** Processing completed - results available
+📁 **Workflow Directory:** wf_APP-2025-000002_run
+💡 **Note:** Detailed processing results have been generated
+"""
+    assert "No document processing found" in router._check_document_processing_status("APP-2025-000009")